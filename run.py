@@ -6,8 +6,15 @@ Usage: python run.py
 
 if __name__ == '__main__':
     from src.app import app
+    from src.startup import start_background_preload
     import os
     
     # Use environment variable to control debug mode
     debug_mode = os.environ.get('FLASK_DEBUG', 'False').lower() == 'true'
+    
+    # Load the audio stack and start the analysis workers in the background so
+    # the server accepts requests immediately (disable with PRELOAD_AUDIO_STACK=false)
+    if os.environ.get('PRELOAD_AUDIO_STACK', 'True').lower() == 'true':
+        start_background_preload()
+    
     app.run(debug=debug_mode, host='0.0.0.0', port=5000)
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Benchmark for the analysis proxy used by get_statistics().
+
+Generates a synthetic 48 kHz stereo file (tone bursts separated by quiet
+noise), then times get_statistics() at full rate and with the 1 kHz mono
+analysis proxy, and reports how far the proxy-based values are from the
+full-rate ones. Nothing is decoded, so FFmpeg is not needed.
+
+Usage:
+    python benchmark_analysis_proxy.py [--minutes M] [--runs N] [--threads T]
+
+Example:
+    python benchmark_analysis_proxy.py --minutes 10 --runs 3
+
+Exits with status 1 if the proxy changes max_dbfs or min_dbfs, if
+non_silence_seconds differs by more than 10 ms, or if the noise floor
+differs by more than 0.5 dB.
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import numpy as np
+from pydub import AudioSegment
+
+from src.audio_processor import AudioProcessor, ThreadConfig
+
+FRAME_RATE = 48000
+
+
+def generate_audio(minutes: float, seed: int = 0) -> AudioSegment:
+    """Build stereo audio alternating 3 s tone bursts with 2 s of quiet noise."""
+    rng = np.random.default_rng(seed)
+    frames = int(minutes * 60 * FRAME_RATE)
+    t = np.arange(frames) / FRAME_RATE
+    tone = 0.25 * np.sin(2 * np.pi * 440 * t)
+    gate = (t % 5.0) < 3.0
+    left = np.where(gate, tone, 0.0) + rng.normal(0, 3e-4, frames)
+    right = np.where(gate, 0.5 * tone, 0.0) + rng.normal(0, 3e-4, frames)
+    interleaved = np.column_stack([left, right]).ravel()
+    data = np.clip(np.rint(interleaved * 32767), -32768, 32767).astype('<i2')
+    return AudioSegment(data=data.tobytes(), sample_width=2, frame_rate=FRAME_RATE, channels=2)
+
+
+def time_statistics(processor: AudioProcessor, runs: int, use_analysis_proxy: bool):
+    """Return (median seconds, statistics) of get_statistics() over several runs."""
+    timings = []
+    stats = None
+    for _ in range(runs):
+        start = time.perf_counter()
+        stats = processor.get_statistics(use_analysis_proxy=use_analysis_proxy)
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings), stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the analysis proxy of get_statistics()')
+    parser.add_argument('--minutes', type=float, default=5.0, help='Length of the generated audio (default: 5)')
+    parser.add_argument('--runs', type=int, default=3, help='Timed runs per mode (default: 3)')
+    parser.add_argument('--threads', type=int, default=None, help='Worker processes (default: configured default)')
+    args = parser.parse_args()
+
+    ThreadConfig.set_num_threads(args.threads)
+    processor = AudioProcessor.from_segment(generate_audio(args.minutes))
+    runs = max(1, args.runs)
+    # Warm up the worker pool so process startup is not timed
+    processor.get_statistics()
+
+    full_time, full = time_statistics(processor, runs, use_analysis_proxy=False)
+    proxy_time, proxy = time_statistics(processor, runs, use_analysis_proxy=True)
+
+    print("=" * 60)
+    print("ANALYSIS PROXY BENCHMARK")
+    print("=" * 60)
+    print(f"Audio: {args.minutes:g} min, {FRAME_RATE} Hz stereo, {ThreadConfig.get_num_threads()} worker(s)")
+    print(f"{'Full rate:':<24}{full_time * 1000:10.1f} ms")
+    print(f"{'Analysis proxy:':<24}{proxy_time * 1000:10.1f} ms")
+    print(f"{'Speedup:':<24}{full_time / proxy_time:10.2f}x")
+    print()
+    print(f"{'Statistic':<24}{'full rate':>12}{'proxy':>12}")
+    for key in ('max_dbfs', 'min_dbfs', 'noise_floor_dbfs', 'non_silence_seconds'):
+        print(f"{key:<24}{full[key]!s:>12}{proxy[key]!s:>12}")
+
+    failed = False
+    if proxy['max_dbfs'] != full['max_dbfs'] or proxy['min_dbfs'] != full['min_dbfs']:
+        print("✗ Peak statistics differ")
+        failed = True
+    if abs(proxy['non_silence_seconds'] - full['non_silence_seconds']) > 0.01:
+        print("✗ Non-silence duration differs by more than 10 ms")
+        failed = True
+    if (full['noise_floor_dbfs'] is None) != (proxy['noise_floor_dbfs'] is None) or (
+            full['noise_floor_dbfs'] is not None
+            and abs(proxy['noise_floor_dbfs'] - full['noise_floor_dbfs']) > 0.5):
+        print("✗ Noise floor differs by more than 0.5 dB")
+        failed = True
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
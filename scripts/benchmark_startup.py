@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Startup-time benchmark for the web application.
+
+Measures, in fresh interpreter processes, how long importing the Flask app
+takes, how long the first request takes, and how long preloading the audio
+stack (pydub, NumPy and the worker pool) takes. It also checks that the
+heavy audio modules are not imported by the web process at startup.
+
+Usage:
+    python benchmark_startup.py [--runs N] [--max-import-ms MS]
+
+Example:
+    python benchmark_startup.py --runs 5 --max-import-ms 400
+
+Exits with status 1 if the median import time exceeds --max-import-ms or if
+pydub/NumPy are loaded at import time, so it can be used to catch regressions.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+# Runs in a fresh interpreter and prints one JSON line with its timings
+PROBE = r"""
+import json, sys, time
+start = time.perf_counter()
+from src.app import app
+import_ms = (time.perf_counter() - start) * 1000
+heavy_modules = sorted(m for m in ('pydub', 'numpy') if m in sys.modules)
+
+app.config['TESTING'] = True
+start = time.perf_counter()
+with app.test_client() as client:
+    client.get('/settings/threads')
+first_request_ms = (time.perf_counter() - start) * 1000
+
+from src.startup import preload_audio_stack
+start = time.perf_counter()
+preload_audio_stack(warm_workers=True)
+preload_ms = (time.perf_counter() - start) * 1000
+
+print(json.dumps({
+    'import_ms': import_ms,
+    'first_request_ms': first_request_ms,
+    'preload_ms': preload_ms,
+    'heavy_modules_at_import': heavy_modules,
+}))
+"""
+
+
+def run_probe():
+    """Run the probe in a fresh interpreter and return its measurements."""
+    output = subprocess.run(
+        [sys.executable, '-c', PROBE],
+        cwd=REPO_ROOT,
+        capture_output=True,
+        text=True,
+        check=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark web application startup time')
+    parser.add_argument('--runs', type=int, default=5, help='Number of fresh processes to measure (default: 5)')
+    parser.add_argument('--max-import-ms', type=float, default=None,
+                        help='Fail if the median app import time exceeds this many milliseconds')
+    args = parser.parse_args()
+
+    results = [run_probe() for _ in range(max(1, args.runs))]
+
+    print("=" * 60)
+    print("STARTUP BENCHMARK")
+    print("=" * 60)
+    for key, label in (('import_ms', 'App import'),
+                       ('first_request_ms', 'First request'),
+                       ('preload_ms', 'Audio stack preload')):
+        values = [r[key] for r in results]
+        print(f"{label + ':':<24}median {statistics.median(values):8.1f} ms   "
+              f"min {min(values):8.1f} ms   max {max(values):8.1f} ms")
+
+    heavy_modules = sorted({m for r in results for m in r['heavy_modules_at_import']})
+    print(f"{'Heavy imports at load:':<24}{', '.join(heavy_modules) if heavy_modules else 'none'}")
+
+    failed = False
+    if heavy_modules:
+        print("✗ The web process imports the audio stack at startup")
+        failed = True
+    median_import = statistics.median(r['import_ms'] for r in results)
+    if args.max_import_ms is not None and median_import > args.max_import_ms:
+        print(f"✗ Median import time {median_import:.1f} ms exceeds {args.max_import_ms:.1f} ms")
+        failed = True
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
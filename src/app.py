@@ -1,17 +1,41 @@
 import os
-import uuid
-from typing import Optional
-from flask import Flask, render_template, request, send_file, jsonify, make_response
+from typing import Optional, Tuple
+import json
+import threading
+from collections import OrderedDict
+from flask import (Flask, render_template, request, send_file, jsonify, make_response, Response,
+                   stream_with_context, after_this_request)
 from werkzeug.utils import secure_filename
 from werkzeug.datastructures import FileStorage
 import tempfile
-from .audio_processor import AudioProcessor, ThreadConfig
+from .thread_config import ThreadConfig
+from .effects import EFFECT_PARAMETERS, GLOBAL_EFFECTS, build_effect_chain, effect_chain_suffix
+from .startup import ffmpeg_available
+from .file_registry import FileRegistry, ContentStore, compute_file_hash, render_key
+from .chunked_upload import ChunkedUploadManager
+from .progress import ProgressTracker, is_valid_progress_id
+from .probe import probe_audio_file
 from werkzeug.exceptions import RequestEntityTooLarge, HTTPException
 
 app = Flask(__name__)
 app.secret_key = os.urandom(24)
-app.config['MAX_CONTENT_LENGTH'] = 100 * 1024 * 1024  # 100MB max file size
+app.config['MAX_CONTENT_LENGTH'] = 100 * 1024 * 1024  # 100MB max file size (per request)
+# Chunked uploads send parts of at most 32MB each, so whole files may be larger
+app.config['MAX_CHUNKED_UPLOAD_BYTES'] = int(os.environ.get('MAX_CHUNKED_UPLOAD_MB', 2048)) * 1024 * 1024
+app.config['MAX_CHUNKED_UPLOAD_SESSIONS'] = int(os.environ.get('MAX_CHUNKED_UPLOAD_SESSIONS', 8))
 app.config['UPLOAD_FOLDER'] = tempfile.gettempdir()
+# File registry settings (overridable through the environment)
+app.config['CONTENT_STORE_DIR'] = os.environ.get(
+    'CONTENT_STORE_DIR', os.path.join(app.config['UPLOAD_FOLDER'], 'audio_store'))
+app.config['REGISTRY_DB_PATH'] = os.environ.get(
+    'REGISTRY_DB_PATH', os.path.join(app.config['UPLOAD_FOLDER'], 'audio_file_registry.sqlite3'))
+app.config['FILE_TTL_SECONDS'] = float(os.environ.get('FILE_TTL_SECONDS', 24 * 3600))
+app.config['STORAGE_QUOTA_BYTES'] = int(os.environ.get('STORAGE_QUOTA_MB', 2048)) * 1024 * 1024
+app.config['JANITOR_INTERVAL_SECONDS'] = float(os.environ.get('JANITOR_INTERVAL_SECONDS', 300))
+# Temporary files untouched for this long are orphans (longer than the chunked-upload idle TTL)
+app.config['TEMP_FILE_MAX_AGE_SECONDS'] = float(os.environ.get('TEMP_FILE_MAX_AGE_SECONDS', 2 * 3600))
+# Run the noise-floor and silence analyses on a 1 kHz mono proxy (peak levels stay exact)
+app.config['ANALYSIS_PROXY'] = os.environ.get('ANALYSIS_PROXY', 'False').lower() == 'true'
 
 # Return JSON for common HTTP errors so frontend JSON parsing doesn't fail when
 # Flask produces an HTML error page (for example 413 Request Entity Too Large).
@@ -36,8 +60,19 @@ def handle_unexpected_error(error: Exception):
 
 #TODO: Add error reporting enpoint to api for logging errors from audio processing and file handling from the frontend
 
-# Store file mappings in memory (in production, use Redis or database)
-file_storage = {}
+# Persistent file registry: maps file IDs to stored files, expires entries
+# after a TTL and evicts least recently used files when over the disk quota
+file_registry = FileRegistry(
+    app.config['REGISTRY_DB_PATH'],
+    ttl_seconds=app.config['FILE_TTL_SECONDS'],
+    max_bytes=app.config['STORAGE_QUOTA_BYTES'],
+    janitor_interval=app.config['JANITOR_INTERVAL_SECONDS']
+)
+file_registry.start_janitor()
+
+# Content-addressed storage: uploads are keyed by their SHA-256 and rendered
+# outputs by the input hash plus operation and parameters
+content_store = ContentStore(app.config['CONTENT_STORE_DIR'])
 
 # Initialize thread configuration with default (half of CPU cores)
 ThreadConfig.set_num_threads()
@@ -51,8 +86,191 @@ def allowed_file(filename):
 def index():
     return render_template('index.html')
 
+# Progress events for analysis and rendering, streamed by /progress/<progress_id>
+progress_tracker = ProgressTracker()
+
+
+def _progress_id_from(value) -> Optional[str]:
+    """Return a client-supplied progress ID if it is valid, else None."""
+    return value if is_valid_progress_id(value) else None
+
+
+def _finish_progress_with_response(progress_id: Optional[str], errors_only: bool = False):
+    """
+    Finish a request's progress job once its response is ready.
+
+    Covers every return path of the handler, so /progress subscribers never
+    wait for a job whose request has already ended. Error responses finish
+    the job with their error message.
+
+    Args:
+        progress_id: ID of the job (nothing happens if None)
+        errors_only: Only finish the job if the response is an error
+            (for requests whose job continues in the background)
+    """
+    if progress_id is None:
+        return
+
+    @after_this_request
+    def finish_progress(response):
+        if response.status_code >= 400:
+            body = response.get_json(silent=True)
+            error = body.get('error') if isinstance(body, dict) else None
+            progress_tracker.finish(progress_id, error=error or 'An error occurred')
+        elif not errors_only:
+            progress_tracker.finish(progress_id)
+        return response
+
+
+# Statistics by content hash, so files uploaded with ?mode=probe are analyzed
+# at most once, on their first GET /statistics/<file_id>
+_STATISTICS_CACHE_SIZE = 256
+_statistics_cache: 'OrderedDict[str, dict]' = OrderedDict()
+_statistics_cache_lock = threading.Lock()
+
+
+def _cache_statistics(content_hash: str, stats: dict):
+    with _statistics_cache_lock:
+        _statistics_cache[content_hash] = stats
+        _statistics_cache.move_to_end(content_hash)
+        while len(_statistics_cache) > _STATISTICS_CACHE_SIZE:
+            _statistics_cache.popitem(last=False)
+
+
+def _cached_statistics(content_hash: Optional[str]) -> Optional[dict]:
+    if content_hash is None:
+        return None
+    with _statistics_cache_lock:
+        stats = _statistics_cache.get(content_hash)
+        if stats is not None:
+            _statistics_cache.move_to_end(content_hash)
+        return stats
+
+
+def _store_upload(temp_path: str, filename: str, extension: str, content_hash: str) -> Tuple[str, str]:
+    """
+    Move an uploaded file into the content store and register it right away.
+    
+    Identical uploads share one stored copy, which may already be in use;
+    registering it before the analysis pins it, so expiry, quota eviction
+    or another request discarding its entry cannot delete it meanwhile.
+    
+    Returns:
+        Tuple of (stored file path, file ID)
+    
+    Raises:
+        FileNotFoundError: If the shared copy was deleted before it was registered
+    """
+    filepath = content_store.add_file(temp_path, extension, key=content_hash)
+    file_id = file_registry.register(filepath, filename, content_hash=content_hash)
+    if not os.path.exists(filepath):
+        file_registry.remove(file_id)
+        raise FileNotFoundError(filepath)
+    return filepath, file_id
+
+
+def _store_and_probe_upload(temp_path: str, filename: str, extension: str, content_hash: str) -> Optional[dict]:
+    """
+    Move an uploaded file into the content store and read its metadata from frame headers.
+    
+    Nothing is decoded; the full analysis is deferred to GET /statistics/<file_id>.
+    
+    Returns:
+        The JSON-serializable upload response, or None if no supported
+        frame headers were found (the file is discarded)
+    """
+    filepath, file_id = _store_upload(temp_path, filename, extension, content_hash)
+    try:
+        metadata = probe_audio_file(filepath, extension)
+    except ValueError as e:
+        print(f"Error probing {filename}: {str(e)}")
+        file_registry.remove(file_id)
+        return None
+    except Exception:
+        file_registry.remove(file_id)
+        raise
+    
+    return {
+        'success': True,
+        'file_id': file_id,
+        'filename': filename,
+        'metadata': metadata
+    }
+
+
+def _store_and_analyze_upload(temp_path: str, filename: str, extension: str, content_hash: str,
+                              progress_id: Optional[str] = None) -> dict:
+    """
+    Move an uploaded file into the content store, analyze it and register it.
+    
+    Shared by the single-request and the chunked upload paths. Identical
+    uploads share one stored copy. Progress (and partial statistics) is
+    reported under progress_id if given.
+    
+    Returns:
+        The JSON-serializable upload response
+    """
+    report = progress_tracker.reporter(progress_id)
+    file_id = None
+    
+    # Process audio file and get statistics
+    try:
+        filepath, file_id = _store_upload(temp_path, filename, extension, content_hash)
+        from .audio_processor import AudioProcessor
+        if report is not None:
+            report('decode', 0, 1)
+        processor = AudioProcessor(filepath)
+        if report is not None:
+            report('decode', 1, 1)
+        stats = processor.get_statistics(progress_callback=report,
+                                         use_analysis_proxy=app.config['ANALYSIS_PROXY'])
+        _cache_statistics(content_hash, stats)
+    except Exception:
+        if file_id is not None:
+            file_registry.remove(file_id)
+        if progress_id is not None:
+            progress_tracker.finish(progress_id, error='An error occurred while processing the file')
+        raise
+    
+    if progress_id is not None:
+        progress_tracker.finish(progress_id)
+    
+    return {
+        'success': True,
+        'file_id': file_id,
+        'filename': filename,
+        'statistics': stats
+    }
+
+
+# Resumable chunked uploads: parts are written to their final offsets and the
+# decode/statistics pipeline starts as soon as the final part lands. Their
+# preallocated files count against the storage quota
+chunked_uploads = ChunkedUploadManager(
+    content_store.temp_path,
+    lambda session: _store_and_analyze_upload(
+        session.temp_path, session.filename, session.extension, session.content_hash, session.progress_id),
+    max_size=app.config['MAX_CHUNKED_UPLOAD_BYTES'],
+    max_sessions=app.config['MAX_CHUNKED_UPLOAD_SESSIONS'],
+    max_reserved_bytes=app.config['STORAGE_QUOTA_BYTES']
+)
+file_registry.add_reservation(chunked_uploads.reserved_bytes)
+
+
+def _sweep_temp_files():
+    """Janitor task: drop abandoned chunked uploads and orphaned temporary files."""
+    chunked_uploads.purge_expired()
+    content_store.purge_stale_temp(app.config['TEMP_FILE_MAX_AGE_SECONDS'])
+    # Render states outlive their render when the registry deletes it
+    content_store.purge_orphaned('json', 'wav')
+
+
+file_registry.add_janitor_task(_sweep_temp_files)
+
 @app.route('/upload', methods=['POST'])
 def upload_file():
+    progress_id = _progress_id_from(request.form.get('progress_id'))
+    _finish_progress_with_response(progress_id)
     if 'file' not in request.files:
         return jsonify({'error': 'No file part'}), 400
 
@@ -66,58 +284,173 @@ def upload_file():
     
     if not allowed_file(file.filename):
         return jsonify({'error': 'Invalid file type. Only mp3, ac3, and aac files are allowed'}), 400
+    
+    # 'probe' reads format metadata and duration from frame headers without
+    # decoding; the full analysis runs later, on GET /statistics/<file_id>
+    mode = request.args.get('mode', 'full')
+    if mode not in ('full', 'probe'):
+        return jsonify({'error': 'Invalid mode'}), 400
+    
+    if mode == 'full' and not ffmpeg_available():
+        return jsonify({'error': 'Audio processing is currently unavailable'}), 503
+    temp_path = None
     try:
         # file.filename can be Optional[str] per type checkers; assert it's a str here
         filename_raw = file.filename
         if not isinstance(filename_raw, str):
             return jsonify({'error': 'Invalid filename'}), 400
         filename = secure_filename(filename_raw)
-        filepath = os.path.join(app.config['UPLOAD_FOLDER'], filename)
-        file.save(filepath)
+        extension = filename.rsplit('.', 1)[1].lower()
         
-        # Process audio file and get statistics
-        processor = AudioProcessor(filepath)
-        stats = processor.get_statistics()
+        # Save to a temporary path inside the content store
+        temp_path = content_store.temp_path(extension)
+        file.save(temp_path)
         
-        # Generate a unique file ID and store the mapping
-        file_id = str(uuid.uuid4())
-        file_storage[file_id] = {
-            'filepath': filepath,
-            'filename': filename
-        }
+        if mode == 'probe':
+            result = _store_and_probe_upload(temp_path, filename, extension, compute_file_hash(temp_path))
+            if result is None:
+                return jsonify({'error': 'Could not read audio metadata from the file'}), 400
+            return jsonify(result)
         
-        return jsonify({
-            'success': True,
-            'file_id': file_id,
-            'filename': filename,
-            'statistics': stats
-        })
+        return jsonify(_store_and_analyze_upload(temp_path, filename, extension, compute_file_hash(temp_path),
+                                                 progress_id))
     except Exception as e:
         # Log the error for debugging (in production, use proper logging)
         print(f"Error in upload_file: {str(e)}")
+        content_store.remove_temp(temp_path)
         return jsonify({'error': 'An error occurred while processing the file'}), 500
 
+@app.route('/upload/chunked', methods=['POST'])
+def init_chunked_upload():
+    """Start a resumable upload. Body: {filename, size, part_size (optional)}."""
+    try:
+        data = request.get_json()
+        if not data or not isinstance(data, dict):
+            return jsonify({'error': 'Invalid or missing JSON body'}), 400
+        # The job itself is finished once the upload has been analyzed
+        progress_id = _progress_id_from(data.get('progress_id'))
+        _finish_progress_with_response(progress_id, errors_only=True)
+        
+        filename_raw = data.get('filename')
+        if not isinstance(filename_raw, str) or filename_raw == '':
+            return jsonify({'error': 'No selected file'}), 400
+        if not allowed_file(filename_raw):
+            return jsonify({'error': 'Invalid file type. Only mp3, ac3, and aac files are allowed'}), 400
+        filename = secure_filename(filename_raw)
+        if '.' not in filename:
+            return jsonify({'error': 'Invalid filename'}), 400
+        
+        try:
+            size = int(data.get('size'))
+            part_size = int(data['part_size']) if data.get('part_size') is not None else None
+        except (ValueError, TypeError):
+            return jsonify({'error': 'size and part_size must be valid integers'}), 400
+        
+        if not ffmpeg_available():
+            return jsonify({'error': 'Audio processing is currently unavailable'}), 503
+        
+        try:
+            session = chunked_uploads.init(filename, filename.rsplit('.', 1)[1].lower(), size, part_size,
+                                           progress_id)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        # Make room for the reserved space by evicting least recently used files
+        file_registry.enforce_quota()
+        
+        return jsonify(dict(session.to_dict(), success=True))
+    except Exception as e:
+        print(f"Error in init_chunked_upload: {str(e)}")
+        return jsonify({'error': 'An error occurred while starting the upload'}), 500
+
+@app.route('/upload/chunked/<upload_id>', methods=['GET'])
+def get_chunked_upload(upload_id):
+    """Get the status of a resumable upload (which parts were received)."""
+    session = chunked_uploads.get(upload_id)
+    if session is None:
+        return jsonify({'error': 'Invalid upload ID'}), 404
+    return jsonify(dict(session.to_dict(), success=True))
+
+@app.route('/upload/chunked/<upload_id>/parts/<int:index>', methods=['PUT'])
+def put_chunked_upload_part(upload_id, index):
+    """Upload one part (raw request body) of a resumable upload."""
+    try:
+        try:
+            session = chunked_uploads.write_part(upload_id, index, request.stream)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        if session is None:
+            return jsonify({'error': 'Invalid upload ID'}), 404
+        
+        return jsonify(dict(session.to_dict(), success=True))
+    except Exception as e:
+        print(f"Error in put_chunked_upload_part: {str(e)}")
+        return jsonify({'error': 'An error occurred while uploading the part'}), 500
+
+@app.route('/upload/chunked/<upload_id>/complete', methods=['POST'])
+def complete_chunked_upload(upload_id):
+    """Finish a resumable upload and return the same response as /upload."""
+    try:
+        try:
+            result = chunked_uploads.complete(upload_id)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        if result is None:
+            return jsonify({'error': 'Invalid upload ID'}), 404
+        
+        return jsonify(result)
+    except Exception as e:
+        print(f"Error in complete_chunked_upload: {str(e)}")
+        return jsonify({'error': 'An error occurred while processing the file'}), 500
+
+@app.route('/upload/chunked/<upload_id>', methods=['DELETE'])
+def abort_chunked_upload(upload_id):
+    """Abort a resumable upload and discard its partial file."""
+    if not chunked_uploads.abort(upload_id):
+        return jsonify({'error': 'Invalid upload ID'}), 404
+    return jsonify({'success': True})
+
+def _base_render_for(file_id: str) -> Optional[dict]:
+    """
+    Return the last full render of a file for incremental mode, or None.
+    
+    Each upload keeps one render entry of its own (identical uploads share
+    storage, but not their editing history).
+    """
+    base_render = file_registry.get_owned(file_id, 'render')
+    if base_render is not None and not os.path.exists(base_render['filepath']):
+        return None
+    return base_render
+
+
+def _register_base_render(file_id: str, render_path: str, render_filename: str):
+    """Make a render the base of the next incremental edit of a file, releasing the previous one."""
+    file_registry.register_owned(file_id, render_path, render_filename, kind='render')
+
 @app.route('/process', methods=['POST'])
 def process_audio():
+    temp_output = temp_render = temp_state = None
     try:
         data = request.get_json()
         # get_json() can return None; guard against that so type-checkers know data is a dict
         if not data or not isinstance(data, dict):
             return jsonify({'error': 'Invalid or missing JSON body'}), 400
+        
+        progress_id = _progress_id_from(data.get('progress_id'))
+        _finish_progress_with_response(progress_id)
+        report = progress_tracker.reporter(progress_id)
 
         file_id = data.get('file_id')
         operation = data.get('operation')
         
-        if not file_id or file_id not in file_storage:
+        file_info = file_registry.get(file_id) if isinstance(file_id, str) else None
+        if file_info is None or file_info['kind'] == 'render':
             return jsonify({'error': 'Invalid file ID'}), 404
         
-        filepath = file_storage[file_id]['filepath']
+        filepath = file_info['filepath']
         
         if not os.path.exists(filepath):
             return jsonify({'error': 'File not found'}), 404
         
-        processor = AudioProcessor(filepath)
-        
         # Extract optional start and end times for sample processing
         start_time = data.get('start_time')
         end_time = data.get('end_time')
@@ -126,48 +459,187 @@ def process_audio():
         start_time = float(start_time) if start_time is not None else None
         end_time = float(end_time) if end_time is not None else None
         
-        if operation == 'compressor':
-            threshold = float(data.get('threshold', -20))
-            ratio = float(data.get('ratio', 4))
-            attack = float(data.get('attack', 5))
-            release = float(data.get('release', 50))
-            
-            output_path = processor.apply_compressor(threshold, ratio, attack, release, start_time, end_time)
+        # Either an ordered effect chain or a single operation with top-level parameters
+        chain = data.get('chain')
+        if chain is None:
+            if operation not in EFFECT_PARAMETERS:
+                return jsonify({'error': 'Invalid operation'}), 400
+            chain = [dict({k: v for k, v in data.items() if k in EFFECT_PARAMETERS[operation]}, effect=operation)]
+        try:
+            chain = build_effect_chain(chain)
+        except ValueError as e:
+            return jsonify({'error': f'Invalid effect chain: {str(e)}'}), 400
+        
+        # 'incremental' keeps the last full render (as PCM) and re-renders only
+        # the start_time..end_time region into it
+        mode = data.get('mode', 'full')
+        if mode not in ('full', 'incremental'):
+            return jsonify({'error': 'Invalid mode'}), 400
+        global_effects = sorted({spec['effect'] for spec in chain if spec['effect'] in GLOBAL_EFFECTS})
+        if mode == 'incremental' and global_effects:
+            return jsonify({'error': f"Invalid effect chain: {', '.join(global_effects)} cannot be used in incremental mode"}), 400
         
-        elif operation == 'limiter':
-            threshold = float(data.get('threshold', -1))
-            release = float(data.get('release', 50))
-            
-            output_path = processor.apply_limiter(threshold, release, start_time, end_time)
+        base_name = os.path.splitext(file_info['filename'])[0]
+        output_filename = f"{base_name}_{effect_chain_suffix(chain)}.mp3"
+        input_hash = file_info['content_hash'] or compute_file_hash(filepath)
         
+        base_render = None
+        if mode == 'incremental':
+            base_render = _base_render_for(file_id)
+            # A region is edited into the last full render; if that render
+            # has expired or was evicted, earlier edits are lost and the
+            # client has to render the whole file again
+            if base_render is None and (start_time is not None or end_time is not None):
+                return jsonify({'error': 'No full render of this file to edit: process it without start_time and end_time first'}), 409
+            base_key = os.path.splitext(os.path.basename(base_render['filepath']))[0] if base_render else None
+            output_key = render_key(input_hash, 'incremental',
+                                    {'base': base_key, 'chain': chain, 'start_time': start_time, 'end_time': end_time})
+        else:
+            output_key = render_key(input_hash, 'chain',
+                                    {'chain': chain, 'start_time': start_time, 'end_time': end_time})
+        render_path = content_store.path_for(output_key, 'wav')
+        render_filename = f"{base_name}_render.wav"
+        
+        # Identical renders (same input content, effect chain and range)
+        # return the already stored output instead of being recomputed
+        cached = file_registry.find_by_hash(output_key, kind='output')
+        if cached is not None and os.path.exists(cached['filepath']) and (mode == 'full' or os.path.exists(render_path)):
+            if mode == 'incremental':
+                # Make the matching render the base of the next edit again
+                _register_base_render(file_id, render_path, render_filename)
+            return jsonify({
+                'success': True,
+                'file_id': cached['file_id'],
+                'filename': cached['filename'],
+                'cached': True
+            })
+        
+        # Decode once, run the whole chain and encode once
+        if not ffmpeg_available():
+            return jsonify({'error': 'Audio processing is currently unavailable'}), 503
+        from .audio_processor import AudioProcessor
+        if report is not None:
+            report('decode', 0, 1)
+        processor = AudioProcessor(filepath)
+        if report is not None:
+            report('decode', 1, 1)
+        temp_output = content_store.temp_path('mp3')
+        if mode == 'incremental':
+            temp_render = content_store.temp_path('wav')
+            temp_state = content_store.temp_path('json')
+            # The compressor state is stored next to the render, so the next
+            # edit can resume the compressors where its region starts
+            processor.apply_chain_incremental(
+                chain, temp_render, temp_output,
+                base_render_path=base_render['filepath'] if base_render else None,
+                start_time=start_time, end_time=end_time,
+                progress_callback=report,
+                state_path=temp_state,
+                base_state_path=content_store.path_for(base_key, 'json') if base_render else None
+            )
+            render_path = content_store.add_file(temp_render, 'wav', key=output_key)
+            content_store.add_file(temp_state, 'json', key=output_key)
+            _register_base_render(file_id, render_path, render_filename)
         else:
-            return jsonify({'error': 'Invalid operation'}), 400
+            processor.apply_chain(chain, start_time, end_time, output_path=temp_output, progress_callback=report)
+        output_path = content_store.add_file(temp_output, 'mp3', key=output_key)
         
-        # Store the output file with a new ID
-        output_id = str(uuid.uuid4())
-        file_storage[output_id] = {
-            'filepath': output_path,
-            'filename': os.path.basename(output_path)
-        }
+        # Register the output file with a new ID
+        output_id = file_registry.register(output_path, output_filename, content_hash=output_key, kind='output')
         
         return jsonify({
             'success': True,
             'file_id': output_id,
-            'filename': os.path.basename(output_path)
+            'filename': output_filename,
+            'cached': False
         })
     
     except Exception as e:
         # Log the error for debugging (in production, use proper logging)
         print(f"Error in process_audio: {str(e)}")
+        content_store.remove_temp(temp_output, temp_render, temp_state)
         return jsonify({'error': 'An error occurred while processing the audio'}), 500
 
+@app.route('/statistics/<file_id>')
+def get_file_statistics(file_id):
+    """
+    Return the full statistics of an uploaded file, analyzing it on first request.
+    
+    Meant for files uploaded with ?mode=probe. The optional 'progress_id'
+    query parameter reports the analysis on /progress/<progress_id>.
+    """
+    progress_id = _progress_id_from(request.args.get('progress_id'))
+    _finish_progress_with_response(progress_id)
+    try:
+        file_info = file_registry.get(file_id)
+        # Render entries are internal (owned by the upload they belong to)
+        if file_info is None or file_info['kind'] == 'render':
+            return jsonify({'error': 'Invalid file ID'}), 404
+        
+        filepath = file_info['filepath']
+        if not os.path.exists(filepath):
+            return jsonify({'error': 'File not found'}), 404
+        
+        stats = _cached_statistics(file_info['content_hash'])
+        if stats is None:
+            if not ffmpeg_available():
+                return jsonify({'error': 'Audio processing is currently unavailable'}), 503
+            report = progress_tracker.reporter(progress_id)
+            from .audio_processor import AudioProcessor
+            if report is not None:
+                report('decode', 0, 1)
+            processor = AudioProcessor(filepath)
+            if report is not None:
+                report('decode', 1, 1)
+            stats = processor.get_statistics(progress_callback=report,
+                                             use_analysis_proxy=app.config['ANALYSIS_PROXY'])
+            if file_info['content_hash']:
+                _cache_statistics(file_info['content_hash'], stats)
+        
+        return jsonify({
+            'success': True,
+            'file_id': file_id,
+            'filename': file_info['filename'],
+            'statistics': stats
+        })
+    except Exception as e:
+        print(f"Error in get_file_statistics: {str(e)}")
+        return jsonify({'error': 'An error occurred while processing the file'}), 500
+
+@app.route('/progress/<progress_id>')
+def progress_events(progress_id):
+    """
+    Stream progress events for an upload or process request as server-sent events.
+    
+    The client picks a progress ID, opens this stream and passes the same ID
+    as 'progress_id' to /upload, /upload/chunked or /process. Each event is a
+    JSON object with stage, done, total, eta_seconds and, during analysis,
+    the partial statistics known so far; the last event is {"event": "done"}.
+    """
+    if not is_valid_progress_id(progress_id):
+        return jsonify({'error': 'Invalid progress ID'}), 400
+    
+    def generate():
+        for event in progress_tracker.events(progress_id):
+            if event is None:
+                yield ': keepalive\n\n'
+            else:
+                yield f"data: {json.dumps(event)}\n\n"
+    
+    return Response(
+        stream_with_context(generate()),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
 @app.route('/download/<file_id>')
 def download_file(file_id):
     try:
-        if file_id not in file_storage:
+        file_info = file_registry.get(file_id)
+        # Render entries are internal (owned by the upload they belong to)
+        if file_info is None or file_info['kind'] == 'render':
             return jsonify({'error': 'Invalid file ID'}), 404
         
-        file_info = file_storage[file_id]
         filepath = file_info['filepath']
         
         if not os.path.exists(filepath):
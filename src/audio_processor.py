@@ -1,57 +1,112 @@
 import os
 import tempfile
-from typing import Optional, Callable, List, Any
+import atexit
+import threading
+import functools
+from typing import Optional, Callable, List, Any, Dict, Tuple
 from pydub import AudioSegment
-from pydub.effects import compress_dynamic_range, normalize
+from pydub.effects import normalize
+from pydub.silence import detect_nonsilent
 import numpy as np
 import concurrent.futures
+from concurrent.futures.process import BrokenProcessPool
 import math
+from .thread_config import ThreadConfig
+from .effects import (
+    EFFECT_PARAMETERS,
+    EFFECT_SUFFIXES,
+    GLOBAL_EFFECTS,
+    SETTLING_TIME_CONSTANTS,
+    MAX_CHAIN_LENGTH,
+    build_effect_chain,
+    effect_chain_suffix,
+    effect_chain_settling_ms,
+)
+from .dynamics import DynamicsChain, RenderState
 
-#TODO: Refactor ThreadConfig to use singleton pattern
 #TODO: Create agent task for refactoring all existing code to use `Type-safety & Pylance guidelines` from `.github/COPILOT_TYPE_SAFETY.md`
 #TODO: Refactor all processing functions to follow parallel processing pattern (see MULTITHREADING_PATTERN.md for details)
-#TODO: Move all import statements to the top of the file
 
-class ThreadConfig:
-    """Configuration for multi-threading in audio processing operations."""
-    _instance = None
-    _num_threads = None
-    
-    def __new__(cls):
-        if cls._instance is None:
-            cls._instance = super(ThreadConfig, cls).__new__(cls)
-        return cls._instance
-    
-    @classmethod
-    def set_num_threads(cls, num_threads: Optional[int] = None):
-        """
-        Set the number of threads to use for audio processing.
-        
-        Args:
-            num_threads: Number of threads to use. If None, defaults to half of CPU cores.
-                        Maximum is the number of CPU cores.
-        """
-        cpu_count = os.cpu_count() or 2
-        if num_threads is None:
-            cls._num_threads = max(1, cpu_count // 2)
-        else:
-            cls._num_threads = max(1, min(num_threads, cpu_count))
-    
-    @classmethod
-    def get_num_threads(cls) -> int:
-        """Get the configured number of threads for audio processing."""
-        if cls._num_threads is None:
-            cls.set_num_threads()
+# Shared worker pool, kept alive between requests and recreated when the
+# configured number of threads changes
+_worker_pool: Optional[concurrent.futures.ProcessPoolExecutor] = None
+_worker_pool_size = 0
+_worker_pool_lock = threading.Lock()
 
-        # At this point _num_threads is guaranteed to be set to an int by set_num_threads()
-        # but the class attribute is typed as Optional[int], so help the type checker.
-        assert isinstance(cls._num_threads, int)
-        return cls._num_threads
-    
-    @classmethod
-    def get_max_threads(cls) -> int:
-        """Get the maximum number of threads (CPU cores)."""
-        return os.cpu_count() or 2
+
+def _init_worker():
+    """Warm up a worker process once, so chunk tasks don't pay first-use costs."""
+    np.frombuffer(b'\x00\x00', dtype=np.int16).astype(np.float32)
+    AudioSegment.silent(duration=1)
+
+
+def _warm_up_task(_):
+    return os.getpid()
+
+
+def _get_worker_pool(num_workers: int) -> concurrent.futures.ProcessPoolExecutor:
+    """Return the shared worker pool, (re)creating it for the requested size."""
+    global _worker_pool, _worker_pool_size
+    with _worker_pool_lock:
+        if _worker_pool is None or _worker_pool_size != num_workers:
+            if _worker_pool is not None:
+                # Tasks already submitted to the old pool still complete
+                _worker_pool.shutdown(wait=False)
+            _worker_pool = concurrent.futures.ProcessPoolExecutor(
+                max_workers=num_workers,
+                initializer=_init_worker
+            )
+            _worker_pool_size = num_workers
+        return _worker_pool
+
+
+def _submit_to_worker_pool(executor: concurrent.futures.ProcessPoolExecutor, num_workers: int,
+                           func: Callable, args_list: List[Any]) -> List[concurrent.futures.Future]:
+    """
+    Submit tasks to a pool returned by _get_worker_pool().
+
+    If another request resized the shared pool in the meantime, the old pool
+    is shut down and refuses new tasks; the tasks already submitted to it
+    still complete, and the rest go to the current pool instead.
+    """
+    futures = []
+    for args in args_list:
+        for attempt in range(3):
+            try:
+                futures.append(executor.submit(func, args))
+                break
+            except BrokenProcessPool:
+                raise
+            except RuntimeError:
+                # 'cannot schedule new futures after shutdown'
+                if attempt == 2:
+                    raise
+                with _worker_pool_lock:
+                    current = _worker_pool
+                executor = current if current is not None and current is not executor else _get_worker_pool(num_workers)
+    return futures
+
+
+def warm_worker_pool():
+    """Start the worker processes ahead of the first request."""
+    num_workers = ThreadConfig.get_num_threads()
+    if num_workers < 2:
+        return
+    pool = _get_worker_pool(num_workers)
+    list(pool.map(_warm_up_task, range(num_workers)))
+
+
+def shutdown_worker_pool():
+    """Shut down the shared worker pool (registered to run at exit)."""
+    global _worker_pool, _worker_pool_size
+    with _worker_pool_lock:
+        if _worker_pool is not None:
+            _worker_pool.shutdown(wait=True)
+        _worker_pool = None
+        _worker_pool_size = 0
+
+
+atexit.register(shutdown_worker_pool)
 
 
 def _parallel_process_audio_chunks(
@@ -59,6 +114,10 @@ def _parallel_process_audio_chunks(
     process_func: Callable,
     chunk_processor_func: Callable,
     min_chunk_size_ms: int = 10000,
+    progress_callback: Optional[Callable[[int, int, Any], None]] = None,
+    align_ms: int = 1,
+    split_kwargs: Optional[List[Dict[str, Any]]] = None,
+    preroll_ms: int = 0,
     **kwargs
 ) -> Any:
     """
@@ -73,46 +132,89 @@ def _parallel_process_audio_chunks(
         process_func: Function to process a single chunk (runs in worker process)
         chunk_processor_func: Function to unpack args and call process_func
         min_chunk_size_ms: Minimum chunk size in milliseconds
+        progress_callback: Optional callback(chunks_done, total_chunks, chunk_result),
+                           called in the calling process with chunks_done=0 (and no
+                           result) when processing starts, then as each chunk finishes
+        align_ms: Chunk sizes are rounded up to a multiple of this many milliseconds
+        split_kwargs: Optional list of keyword overrides; each chunk is then processed
+                      once per entry (e.g. per group of channels), as separate tasks
+        preroll_ms: Also pass this much of the preceding audio with every chunk but
+                    the first (e.g. to settle a filter); process_func then receives
+                    preroll_frames, the number of leading frames that belong to
+                    the previous chunk
         **kwargs: Additional arguments to pass to process_func
         
     Returns:
         Result depends on the process_func - typically a list of results from each chunk
+        (with split_kwargs, a list per chunk holding the result for each entry)
     """
     audio_length_ms = len(audio)
     num_workers = ThreadConfig.get_num_threads()
     chunk_size_ms = max(min_chunk_size_ms, audio_length_ms // num_workers)
+    chunk_size_ms = -(-chunk_size_ms // align_ms) * align_ms
     
     chunks = []
+    preroll_frames = []
     for i in range(0, audio_length_ms, chunk_size_ms):
         start = i
         end = min(i + chunk_size_ms, audio_length_ms)
-        chunks.append(audio[start:end])
+        chunk = audio[start:end]
+        if preroll_ms and start > 0:
+            with_preroll = audio[max(0, start - preroll_ms):end]
+            preroll_frames.append(int(with_preroll.frame_count()) - int(chunk.frame_count()))
+            chunk = with_preroll
+        else:
+            preroll_frames.append(0)
+        chunks.append(chunk)
+    
+    variants = [dict(kwargs, **overrides) for overrides in split_kwargs] if split_kwargs else [kwargs]
+    
+    def task_kwargs(chunk_index, variant):
+        return dict(variant, preroll_frames=preroll_frames[chunk_index]) if preroll_ms else variant
     
-    # Single chunk - process directly without multiprocessing overhead
-    if len(chunks) == 1:
+    # Report the start, so the ETA is measured from here rather than from
+    # the first finished chunk
+    if progress_callback is not None:
+        progress_callback(0, len(chunks) * len(variants), None)
+    
+    # Single task - process directly without multiprocessing overhead
+    if len(chunks) == 1 and len(variants) == 1:
         args = (
             chunks[0].raw_data,
             chunks[0].sample_width,
             chunks[0].frame_rate,
             chunks[0].channels,
-            kwargs
+            task_kwargs(0, variants[0])
         )
-        return [chunk_processor_func(args)]
+        result = chunk_processor_func(args)
+        if progress_callback is not None:
+            progress_callback(1, 1, result)
+        return [[result]] if split_kwargs else [result]
     
-    # Multiple chunks - use parallel processing
-    with concurrent.futures.ProcessPoolExecutor(max_workers=num_workers) as executor:
-        args_list = [
-            (chunk.raw_data, chunk.sample_width, chunk.frame_rate, chunk.channels, kwargs)
-            for chunk in chunks
-        ]
-        results = list(executor.map(chunk_processor_func, args_list))
+    # Multiple tasks - use the shared, pre-warmed worker pool
+    executor = _get_worker_pool(num_workers)
+    args_list = [
+        (chunk.raw_data, chunk.sample_width, chunk.frame_rate, chunk.channels, task_kwargs(index, variant))
+        for index, chunk in enumerate(chunks)
+        for variant in variants
+    ]
+    try:
+        futures = _submit_to_worker_pool(executor, num_workers, chunk_processor_func, args_list)
+        if progress_callback is not None:
+            for done, future in enumerate(concurrent.futures.as_completed(futures), start=1):
+                progress_callback(done, len(futures), future.result())
+        results = [future.result() for future in futures]
+    except BrokenProcessPool:
+        # A worker died; drop the pool so the next call starts a fresh one
+        shutdown_worker_pool()
+        raise
     
+    if split_kwargs:
+        return [results[i:i + len(variants)] for i in range(0, len(results), len(variants))]
     return results
 
 
 def _process_chunk_for_nonsilence(chunk_bytes, sample_width, frame_rate, channels, silence_threshold):
-    from pydub import AudioSegment
-    from pydub.silence import detect_nonsilent
     chunk = AudioSegment(
         data=chunk_bytes,
         sample_width=sample_width,
@@ -132,46 +234,457 @@ def _unpack_args_for_nonsilence(args):
     return _process_chunk_for_nonsilence(chunk_bytes, sample_width, frame_rate, channels, silence_threshold)
 
 
-def _process_chunk_for_max_dbfs(chunk_bytes, sample_width, frame_rate, channels):
-    """Process a chunk to find maximum dBFS."""
-    from pydub import AudioSegment
-    chunk = AudioSegment(
-        data=chunk_bytes,
-        sample_width=sample_width,
-        frame_rate=frame_rate,
-        channels=channels
-    )
-    return chunk.max_dBFS
+def _process_proxy_chunk_for_nonsilence(chunk_bytes, sample_width, frame_rate, channels, silence_threshold,
+                                        min_silence_len=100):
+    """
+    Vectorized detect_nonsilent() for analysis proxy chunks (one sample per millisecond).
+    
+    Gives the same result as running detect_nonsilent() on the proxy chunk:
+    the RMS of every min_silence_len window comes from a cumulative sum,
+    and silent windows closer than min_silence_len are merged into ranges
+    the same way. Returns the non-silent duration in milliseconds.
+    """
+    values = _samples_from_bytes(chunk_bytes, sample_width).astype(np.int64)
+    length = values.size
+    if length < min_silence_len:
+        return length
+    cumulative = np.concatenate(([0], np.cumsum(values * values)))
+    window_sums = cumulative[min_silence_len:] - cumulative[:-min_silence_len]
+    # audioop.rms() truncates to an integer
+    rms = np.floor(np.sqrt(window_sums / min_silence_len))
+    threshold = 10 ** (silence_threshold / 20) * 2 ** (sample_width * 8 - 1)
+    return _nonsilent_ms_from_silent_windows(rms <= threshold, length, min_silence_len)
+
 
+def _nonsilent_ms_from_silent_windows(silent, length, min_silence_len):
+    """
+    Non-silent milliseconds given which min_silence_len windows are silent.
+    
+    Merges silent windows into ranges like detect_silence() (windows less
+    than min_silence_len apart join one range) and returns the remaining length.
+    
+    Args:
+        silent: Boolean array, one entry per window start (1 ms apart)
+        length: Length of the audio in milliseconds
+        min_silence_len: Window length in milliseconds
+    """
+    silence_starts = np.flatnonzero(silent)
+    if silence_starts.size == 0:
+        return length
+    breaks = np.flatnonzero(np.diff(silence_starts) > min_silence_len)
+    range_starts = silence_starts[np.concatenate(([0], breaks + 1))]
+    range_ends = silence_starts[np.concatenate((breaks, [silence_starts.size - 1]))] + min_silence_len
+    return int(length - (range_ends - range_starts).sum())
 
-def _unpack_args_for_max_dbfs(args):
+
+def _unpack_args_for_proxy_nonsilence(args):
     chunk_bytes, sample_width, frame_rate, channels, kwargs = args
-    return _process_chunk_for_max_dbfs(chunk_bytes, sample_width, frame_rate, channels)
+    silence_threshold = kwargs.get('silence_threshold', -50)
+    return _process_proxy_chunk_for_nonsilence(chunk_bytes, sample_width, frame_rate, channels, silence_threshold)
+
+
+# Windowed-RMS histogram used for the noise-floor estimate: 0.5 dB bins
+# covering -120..0 dBFS (quieter windows land in the lowest bin)
+NOISE_FLOOR_WINDOW_MS = 50
+NOISE_FLOOR_PERCENTILE = 10
+NOISE_FLOOR_HISTOGRAM_EDGES = np.linspace(-120.0, 0.0, 241)
+
+# NumPy dtypes for pydub sample widths (pydub stores 24-bit audio as 32-bit)
+_SAMPLE_DTYPES = {1: np.int8, 2: np.dtype('<i2'), 4: np.dtype('<i4')}
 
+# Windows per batch when computing windowed RMS, bounding the float copy
+_RMS_WINDOW_BATCH = 256
 
-def _process_chunk_for_min_dbfs(chunk_bytes, sample_width, frame_rate, channels):
-    """Process a chunk to find minimum non-zero sample for dBFS calculation."""
-    from pydub import AudioSegment
-    import numpy as np
+
+def _samples_from_bytes(chunk_bytes, sample_width):
+    """View raw little-endian PCM bytes as a NumPy array without copying."""
+    return np.frombuffer(chunk_bytes, dtype=_SAMPLE_DTYPES[sample_width])
+
+
+def _min_nonzero_magnitude(values) -> float:
+    """
+    Return the smallest non-zero magnitude of a float batch (inf if all are zero).
     
-    chunk = AudioSegment(
-        data=chunk_bytes,
-        sample_width=sample_width,
-        frame_rate=frame_rate,
-        channels=channels
-    )
+    Takes abs() in place, so pass a scratch copy (e.g. the float32 batch the
+    caller already made; the widened type cannot overflow on the most
+    negative integer sample).
+    """
+    magnitudes = np.abs(values, out=values)
+    return float(np.min(magnitudes, where=magnitudes > 0, initial=np.inf))
+
+
+def _process_chunk_for_min_dbfs(chunk_bytes, sample_width, frame_rate, channels, window_ms=NOISE_FLOOR_WINDOW_MS):
+    """
+    Process a chunk to find the minimum non-zero sample and a windowed-RMS histogram.
     
-    samples = np.array(chunk.get_array_of_samples())
-    non_zero_samples = samples[samples != 0]
+    Works directly on the raw bytes: the RMS of each window and the minimum
+    non-zero magnitude are computed from the same small float32 batches, so
+    memory stays bounded and the samples are read once. Windows of digital
+    silence are left out of the histogram.
     
-    if len(non_zero_samples) > 0:
-        return np.abs(non_zero_samples).min()
-    return None
+    Returns:
+        Tuple of (minimum non-zero absolute sample or None, histogram counts)
+    """
+    samples = _samples_from_bytes(chunk_bytes, sample_width)
+    full_scale = float(2 ** (sample_width * 8 - 1))
+    min_abs = np.inf
+    
+    histogram = np.zeros(len(NOISE_FLOOR_HISTOGRAM_EDGES) - 1, dtype=np.int64)
+    window_len = max(1, int(frame_rate * window_ms / 1000)) * channels
+    num_windows = -(-samples.size // window_len)
+    for first in range(0, num_windows, _RMS_WINDOW_BATCH):
+        batch = samples[first * window_len:(first + _RMS_WINDOW_BATCH) * window_len]
+        full = batch.size // window_len
+        mean_squares = []
+        if full:
+            windows = batch[:full * window_len].reshape(full, window_len).astype(np.float32)
+            mean_squares.append(np.einsum('ij,ij->i', windows, windows) / window_len)
+            min_abs = min(min_abs, _min_nonzero_magnitude(windows))
+        if batch.size > full * window_len:
+            rest = batch[full * window_len:].astype(np.float32)
+            mean_squares.append(np.array([np.dot(rest, rest) / rest.size], dtype=np.float32))
+            min_abs = min(min_abs, _min_nonzero_magnitude(rest))
+        if not mean_squares:
+            continue
+        rms = np.sqrt(np.concatenate(mean_squares))
+        rms = rms[rms > 0]
+        if rms.size == 0:
+            continue
+        rms_db = 20 * np.log10(rms / full_scale)
+        clipped = np.clip(rms_db, NOISE_FLOOR_HISTOGRAM_EDGES[0], NOISE_FLOOR_HISTOGRAM_EDGES[-1])
+        histogram += np.histogram(clipped, bins=NOISE_FLOOR_HISTOGRAM_EDGES)[0]
+    
+    return (int(min_abs) if min_abs != np.inf else None), histogram
 
 
 def _unpack_args_for_min_dbfs(args):
     chunk_bytes, sample_width, frame_rate, channels, kwargs = args
-    return _process_chunk_for_min_dbfs(chunk_bytes, sample_width, frame_rate, channels)
+    window_ms = kwargs.get('window_ms', NOISE_FLOOR_WINDOW_MS)
+    return _process_chunk_for_min_dbfs(chunk_bytes, sample_width, frame_rate, channels, window_ms)
+
+
+def _histogram_percentile(histogram, edges, percentile):
+    """Return the value at a percentile of a histogram (upper edge of the matching bin)."""
+    total = histogram.sum()
+    if total == 0:
+        return None
+    cumulative = np.cumsum(histogram)
+    index = int(np.searchsorted(cumulative, total * percentile / 100.0))
+    return float(edges[min(index + 1, len(edges) - 1)])
+
+
+def _min_amplitude_to_dbfs(amplitudes, sample_width):
+    """Convert the smallest of per-chunk minimum amplitudes to dBFS (-inf if there are none)."""
+    if len(amplitudes) == 0:
+        return -float('inf')
+    
+    min_amplitude = min(amplitudes)
+    max_possible = 2 ** (sample_width * 8 - 1)
+    ratio = min_amplitude / max_possible
+    
+    if ratio > 0:
+        return 20 * np.log10(ratio)
+    return None
+
+
+# Analysis proxy: one int16 value per millisecond (see _analysis_proxy_from_mean_squares())
+ANALYSIS_PROXY_RATE = 1000
+
+
+def _analysis_proxy_from_mean_squares(mean_squares) -> AudioSegment:
+    """
+    Build a low-rate mono int16 stand-in for RMS-based analyses.
+    
+    Each proxy sample is the RMS over all channels of one millisecond of the
+    source, i.e. the power is downmixed and decimated, with the block mean
+    acting as the anti-alias filter. Decimating the waveform itself would
+    drop the energy above the new Nyquist frequency and let out-of-phase
+    channels cancel, biasing every RMS measurement. The per-channel pass
+    (_analyze_channels()) collects the power over pydub's millisecond
+    slices, so the mean square of any window of whole milliseconds equals
+    that of the source.
+    
+    Accuracy: only rounding to int16 is lost. A proxy value v is off by at
+    most 0.5, i.e. 20*log10(1 + 0.5/v) dB: under 0.05 dB above -50 dBFS and
+    under 0.5 dB above -70 dBFS. Milliseconds below about -96 dBFS round to
+    zero and count as digital silence, so noise floors under about -80 dBFS
+    (e.g. from 24-bit sources) are not reliable. Peak and minimum sample
+    values are not available from the proxy.
+    
+    Args:
+        mean_squares: Per-millisecond mean square over all channels (full scale = 1)
+    
+    Returns:
+        Mono 16-bit AudioSegment at ANALYSIS_PROXY_RATE, one sample per millisecond
+    """
+    proxy = np.clip(np.rint(np.sqrt(mean_squares) * 32768.0), 0, 32767).astype('<i2')
+    return AudioSegment(data=proxy.tobytes(), sample_width=2, frame_rate=ANALYSIS_PROXY_RATE, channels=1)
+
+
+# Per-channel statistics. Loudness follows ITU-R BS.1770: K-weighted mean
+# square over 400 ms blocks with 75% overlap (i.e. four 100 ms sub-blocks),
+# with an absolute gate at -70 LUFS and a relative gate 10 LU below
+LOUDNESS_SUBBLOCK_MS = 100
+LOUDNESS_ABSOLUTE_GATE_LUFS = -70.0
+LOUDNESS_RELATIVE_GATE_LU = -10.0
+
+# Files with at least this many channels are also split by channel groups
+# across the worker pool (see _calculate_channel_statistics())
+CHANNEL_PARALLEL_MIN_CHANNELS = 6
+
+# Milliseconds of interleaved audio converted per batch (a multiple of
+# LOUDNESS_SUBBLOCK_MS), bounding the float copy
+_CHANNEL_STATS_BATCH_MS = 10000
+
+# Minimum FFT length of the overlap-save K-weighting (see _k_weighted())
+_K_WEIGHTING_FFT_LEN = 16384
+
+# Channel labels in the order of FFmpeg's default layouts for each channel count
+# (six channels decode as 5.1(side), e.g. AC-3 3/2+LFE, so the surrounds are SL/SR)
+_CHANNEL_LABELS = {
+    1: ('M',),
+    2: ('L', 'R'),
+    6: ('FL', 'FR', 'FC', 'LFE', 'SL', 'SR'),
+    8: ('FL', 'FR', 'FC', 'LFE', 'BL', 'BR', 'SL', 'SR'),
+}
+
+
+def _k_weighting_biquads(frame_rate):
+    """
+    Coefficients (b, a) of the two BS.1770 K-weighting biquads for a sample rate.
+    
+    The high shelf and the high pass are designed for the given sample rate
+    so that they match the BS.1770 reference coefficients at 48 kHz.
+    """
+    # Stage 1: high shelf (+4 dB above about 1.7 kHz)
+    k = math.tan(math.pi * 1681.974450955533 / frame_rate)
+    q = 0.7071752369554196
+    vh = 10 ** (3.999843853973347 / 20)
+    vb = vh ** 0.4996667741545416
+    a0 = 1 + k / q + k * k
+    shelf_b = np.array([(vh + vb * k / q + k * k) / a0, 2 * (k * k - vh) / a0, (vh - vb * k / q + k * k) / a0])
+    shelf_a = np.array([1.0, 2 * (k * k - 1) / a0, (1 - k / q + k * k) / a0])
+    # Stage 2: high pass at about 38 Hz
+    k = math.tan(math.pi * 38.13547087602444 / frame_rate)
+    q = 0.5003270373238773
+    a0 = 1 + k / q + k * k
+    highpass_b = np.array([1.0, -2.0, 1.0])
+    highpass_a = np.array([1.0, 2 * (k * k - 1) / a0, (1 - k / q + k * k) / a0])
+    return [(shelf_b, shelf_a), (highpass_b, highpass_a)]
+
+
+@functools.lru_cache(maxsize=8)
+def _k_weighting_impulse_response(frame_rate):
+    """
+    Impulse response of the K-weighting filter, truncated where it has decayed.
+    
+    Sampled from the frequency response over about two seconds (the filter
+    settles within about 60 ms at any sample rate), then cut where the
+    remaining tail holds less than 1e-14 of the energy, so convolving with
+    it matches the recursive filter to well below the loudness gates.
+    """
+    n = 1 << (int(frame_rate).bit_length() + 1)
+    z_inv = np.exp(-2j * np.pi * np.arange(n // 2 + 1) / n)
+    # Evaluate B(z)/A(z) at z = e^(jw): coefficients of z^0, z^-1, z^-2
+    powers = np.stack([np.ones_like(z_inv), z_inv, z_inv * z_inv])
+    response = np.ones_like(z_inv)
+    for b, a in _k_weighting_biquads(frame_rate):
+        response *= (b @ powers) / (a @ powers)
+    impulse_response = np.fft.irfft(response, n)
+    tail_energy = np.cumsum(impulse_response[::-1] ** 2)[::-1]
+    length = int(np.argmax(tail_energy <= 1e-14 * tail_energy[0]))
+    return impulse_response[:max(length, 1)]
+
+
+def _k_weighting_preroll_ms(frame_rate):
+    """Milliseconds of preceding audio the K-weighting filter needs (its settling time)."""
+    return -(-len(_k_weighting_impulse_response(frame_rate)) * 1000 // frame_rate)
+
+
+def _k_weighted(x, history, impulse_response):
+    """
+    K-weight a batch of (frames, channels) samples in the time domain.
+    
+    Overlap-save convolution with the truncated impulse response, in short
+    FFT blocks: the filter state is carried in by the frames preceding the
+    batch, so results do not depend on where batches or chunks start.
+    
+    Args:
+        x: Float samples of the batch, one column per channel
+        history: Up to len(impulse_response) - 1 frames before the batch (fewer
+                 at the start of the audio, where the filter starts at rest)
+        impulse_response: See _k_weighting_impulse_response()
+    
+    Returns:
+        K-weighted samples as a (channels, frames) array
+    """
+    taps = len(impulse_response)
+    fft_len = max(_K_WEIGHTING_FFT_LEN, 1 << (4 * taps).bit_length())
+    hop = fft_len - taps + 1
+    num_blocks = -(-x.shape[0] // hop)
+    # Channel-major, so every FFT block is contiguous; zeros before the
+    # history are the filter at rest
+    signal = np.zeros((x.shape[1], num_blocks * hop + taps - 1))
+    signal[:, taps - 1 - len(history):taps - 1] = history.T
+    signal[:, taps - 1:taps - 1 + x.shape[0]] = x.T
+    blocks = np.lib.stride_tricks.sliding_window_view(signal, fft_len, axis=-1)[:, ::hop]
+    spectrum = np.fft.rfft(blocks, axis=-1) * np.fft.rfft(impulse_response, fft_len)
+    # The first taps - 1 outputs of each block wrap around and are discarded
+    weighted = np.fft.irfft(spectrum, fft_len, axis=-1)[..., taps - 1:]
+    return weighted.reshape(x.shape[1], -1)[:, :x.shape[0]]
+
+
+def _process_chunk_for_channel_stats(chunk_bytes, sample_width, frame_rate, channels, channel_indices=None,
+                                     silence_threshold=-50, min_silence_len=100, preroll_frames=0,
+                                     with_proxy=False):
+    """
+    Process a chunk to find per-channel peak, mean square, non-silence and loudness sub-blocks.
+    
+    Works on the interleaved buffer in one pass: each batch of frames is
+    viewed as a (frames, channels) array and every statistic is computed
+    along the frame axis for all channels at once, so no per-channel copies
+    of the audio are made. K-weighting runs in the time domain with the
+    filter state carried across batches (see _k_weighted()) and into the
+    chunk from its pre-roll, so sub-block powers match filtering the whole
+    file at once. Non-silence uses the same windows and merging as
+    detect_nonsilent(), per channel.
+    
+    Args:
+        channel_indices: Channels to analyze (default: all)
+        preroll_frames: Leading frames that only prime the K-weighting filter
+                        (the end of the previous chunk); not analyzed otherwise
+        with_proxy: Also return the minimum sample and the per-millisecond power,
+                    from which get_statistics() takes min dBFS and the analysis proxy
+    
+    Returns:
+        Tuple of (channel indices, peak sample magnitudes, sums of squares,
+        frame count, non-silent milliseconds per channel, K-weighted mean
+        square of each complete sub-block as a (sub-blocks, channels) array,
+        minimum non-zero absolute sample of the group, per-millisecond mean
+        square summed over the group), with per-channel values normalized to
+        full scale; the last two are None unless with_proxy is set
+    """
+    samples = _samples_from_bytes(chunk_bytes, sample_width)
+    total_frames = samples.size // channels
+    all_frames = samples[:total_frames * channels].reshape(total_frames, channels)
+    group = list(range(channels)) if channel_indices is None else list(channel_indices)
+    full_scale = float(2 ** (sample_width * 8 - 1))
+    # Filter history for each batch comes from the frames before it (pre-roll included)
+    interleaved = all_frames[preroll_frames:]
+    frames = interleaved.shape[0]
+    impulse_response = _k_weighting_impulse_response(frame_rate)
+    
+    length_ms = int(round(frames * 1000 / frame_rate))
+    # Same frame boundaries as pydub's slicing at each millisecond
+    ms_bounds = np.arange(length_ms + 1, dtype=np.int64) * frame_rate // 1000
+    ms_bounds[-1] = frames
+    subblock_len = frame_rate * LOUDNESS_SUBBLOCK_MS // 1000
+    
+    peaks = np.zeros(len(group))
+    sum_squares = np.zeros(len(group))
+    ms_sums = np.empty((length_ms, len(group)))
+    subblock_power = []
+    min_abs = np.inf
+    for first_ms in range(0, length_ms, _CHANNEL_STATS_BATCH_MS):
+        last_ms = min(first_ms + _CHANNEL_STATS_BATCH_MS, length_ms)
+        start, end = ms_bounds[first_ms], ms_bounds[last_ms]
+        rows = interleaved[start:end] if channel_indices is None else interleaved[start:end, group]
+        x = rows.astype(np.float64) / full_scale
+        
+        # Reductions along the frame axis go through per-millisecond blocks
+        # (reduceat), which is much faster than reducing a narrow array directly
+        local_bounds = ms_bounds[first_ms:last_ms] - start
+        block_max = np.maximum.reduceat(rows, local_bounds, axis=0).max(axis=0).astype(np.float64)
+        block_min = np.minimum.reduceat(rows, local_bounds, axis=0).min(axis=0).astype(np.float64)
+        peaks = np.maximum(peaks, np.maximum(block_max, -block_min) / full_scale)
+        ms_sums[first_ms:last_ms] = np.add.reduceat(x * x, local_bounds, axis=0)
+        sum_squares += ms_sums[first_ms:last_ms].sum(axis=0)
+        
+        # Only complete sub-blocks count (batches start on sub-block boundaries)
+        complete = x.shape[0] // subblock_len
+        if complete:
+            history_start = max(0, preroll_frames + start - (len(impulse_response) - 1))
+            history = all_frames[history_start:preroll_frames + start]
+            if channel_indices is not None:
+                history = history[:, group]
+            weighted = _k_weighted(x[:complete * subblock_len], history.astype(np.float64) / full_scale,
+                                   impulse_response).reshape(len(group), complete, subblock_len)
+            subblock_power.append(np.einsum('csl,csl->sc', weighted, weighted) / subblock_len)
+        
+        if with_proxy:
+            # Last use of the batch, so abs() may work in place
+            min_abs = min(min_abs, _min_nonzero_magnitude(x))
+    
+    # Non-silence per channel from the RMS of every min_silence_len window
+    nonsilent_ms = []
+    threshold = 10 ** (silence_threshold / 20)
+    for column in range(len(group)):
+        if length_ms < min_silence_len:
+            nonsilent_ms.append(length_ms)
+            continue
+        cumulative = np.concatenate(([0.0], np.cumsum(ms_sums[:, column])))
+        window_sums = cumulative[min_silence_len:] - cumulative[:-min_silence_len]
+        window_frames = ms_bounds[min_silence_len:] - ms_bounds[:-min_silence_len]
+        rms = np.sqrt(np.maximum(window_sums, 0.0) / window_frames)
+        nonsilent_ms.append(_nonsilent_ms_from_silent_windows(rms <= threshold, length_ms, min_silence_len))
+    
+    subblocks = np.concatenate(subblock_power) if subblock_power else np.zeros((0, len(group)))
+    if not with_proxy:
+        return group, peaks, sum_squares, frames, nonsilent_ms, subblocks, None, None
+    ms_power = ms_sums.sum(axis=1) / np.maximum(np.diff(ms_bounds), 1)
+    min_sample = int(round(min_abs * full_scale)) if min_abs != np.inf else None
+    return group, peaks, sum_squares, frames, nonsilent_ms, subblocks, min_sample, ms_power
+
+
+def _unpack_args_for_channel_stats(args):
+    chunk_bytes, sample_width, frame_rate, channels, kwargs = args
+    return _process_chunk_for_channel_stats(
+        chunk_bytes, sample_width, frame_rate, channels,
+        channel_indices=kwargs.get('channel_indices'),
+        silence_threshold=kwargs.get('silence_threshold', -50),
+        preroll_frames=kwargs.get('preroll_frames', 0),
+        with_proxy=kwargs.get('with_proxy', False)
+    )
+
+
+def _gated_loudness(subblock_power):
+    """
+    Gated loudness in LUFS from K-weighted 100 ms sub-block mean squares (BS.1770).
+    
+    Returns:
+        Loudness in LUFS, or None if the audio is shorter than one 400 ms
+        block or every block is below the absolute gate
+    """
+    if len(subblock_power) < 4:
+        return None
+    block_power = (subblock_power[:-3] + subblock_power[1:-2] + subblock_power[2:-1] + subblock_power[3:]) / 4
+    with np.errstate(divide='ignore'):
+        block_loudness = -0.691 + 10 * np.log10(block_power)
+    gated = block_loudness > LOUDNESS_ABSOLUTE_GATE_LUFS
+    if not gated.any():
+        return None
+    relative_gate = -0.691 + 10 * np.log10(block_power[gated].mean()) + LOUDNESS_RELATIVE_GATE_LU
+    gated &= block_loudness > relative_gate
+    return float(-0.691 + 10 * np.log10(block_power[gated].mean()))
+
+
+def _ratio_to_dbfs(ratio):
+    """Convert a full-scale ratio to dBFS rounded to 0.01 dB (None for silence)."""
+    return round(20 * math.log10(ratio), 2) if ratio > 0 else None
+
+
+def _apply_dynamics(audio: AudioSegment, chain: List[Dict[str, Any]]) -> AudioSegment:
+    """Run compressor and gain specs over a whole segment, one checkpoint interval at a time."""
+    dynamics = DynamicsChain(chain, audio.frame_rate, audio.sample_width)
+    dynamics.start(0)
+    frames = _samples_from_bytes(audio.raw_data, audio.sample_width).reshape(-1, audio.channels)
+    output = np.empty_like(frames)
+    for start in range(0, len(frames), dynamics.interval):
+        block = frames[start:start + dynamics.interval]
+        output[start:start + len(block)] = dynamics.feed(block.astype(np.int64))
+    return AudioSegment(data=output.tobytes(), sample_width=audio.sample_width,
+                        frame_rate=audio.frame_rate, channels=audio.channels)
+
 
 class AudioProcessor:
     """Process audio files and provide statistics and effects."""
@@ -180,6 +693,14 @@ class AudioProcessor:
         """Initialize with an audio file path."""
         self.filepath = filepath
         self.audio = self._load_audio(filepath)
+    
+    @classmethod
+    def from_segment(cls, audio: AudioSegment, filepath: str = 'generated.mp3') -> 'AudioProcessor':
+        """Create a processor around already decoded audio (no file is read)."""
+        processor = cls.__new__(cls)
+        processor.filepath = filepath
+        processor.audio = audio
+        return processor
         
     def _load_audio(self, filepath):
         """Load audio file using pydub."""
@@ -194,71 +715,127 @@ class AudioProcessor:
         else:
             raise ValueError(f"Unsupported file format: {file_extension}")
     
-    def get_statistics(self):
-        """Get audio file statistics using multi-threaded analysis."""
-        # Get max dBFS using multi-threaded processing
-        max_dbfs = self._calculate_max_dbfs()
+    def get_statistics(self, progress_callback: Optional[Callable[..., None]] = None,
+                       use_analysis_proxy: bool = False):
+        """
+        Get audio file statistics using multi-threaded analysis.
         
-        # Get min dBFS using multi-threaded processing
-        min_dbfs = self._calculate_min_dbfs()
+        The per-channel pass runs first and also yields the overall peak (the
+        largest channel peak), so no separate peak pass is needed.
         
+        Args:
+            progress_callback: Optional callback(stage, chunks_done, total_chunks, statistics=partial_stats),
+                               called as chunks of each analysis stage ('channels', 'noise_floor',
+                               'silence') finish; partial_stats holds the values known so far
+            use_analysis_proxy: Run the noise-floor and silence analyses on the
+                                low-rate mono proxy (see _analysis_proxy_from_mean_squares()
+                                for accuracy bounds), built from the per-channel pass, which
+                                is then the only full-rate pass; peak and min dBFS stay exact
+        """
         # Get total duration in seconds
         duration_seconds = len(self.audio) / 1000.0
         
-        # Calculate non-silence duration using multi-threaded processing
         # Threshold for silence: -50 dBFS (reasonable default)
         silence_threshold = -50
-        non_silent_duration = self._calculate_non_silence_duration(silence_threshold)
+        
+        partial = {
+            'duration_seconds': round(duration_seconds, 2),
+            'silence_threshold_db': silence_threshold,
+            'sample_rate': self.audio.frame_rate,
+            'channels': self.audio.channels,
+            'sample_width': self.audio.sample_width
+        }
+        
+        def stage_callback(stage, on_result=None):
+            if progress_callback is None:
+                return None
+            
+            def on_chunk(done, total, result):
+                if on_result is not None and result is not None:
+                    on_result(result)
+                progress_callback(stage, done, total, statistics=dict(partial))
+            return on_chunk
+        
+        def update_peak(result):
+            # Running peak over the chunks (and channel groups) finished so far
+            chunk_peak = _ratio_to_dbfs(float(np.max(result[1], initial=0.0)))
+            if chunk_peak is not None and ('max_dbfs' not in partial or chunk_peak > partial['max_dbfs']):
+                partial['max_dbfs'] = chunk_peak
+        
+        # Per-channel peak, RMS, non-silence and loudness in one pass over the interleaved data
+        channel_statistics, min_dbfs, proxy = self._analyze_channels(
+            silence_threshold, progress_callback=stage_callback('channels', update_peak),
+            with_proxy=use_analysis_proxy)
+        channel_peaks = [c['max_dbfs'] for c in channel_statistics if c['max_dbfs'] is not None]
+        max_dbfs = max(channel_peaks) if channel_peaks else -float('inf')
+        partial['max_dbfs'] = max_dbfs
+        
+        if proxy is not None:
+            noise_floor_dbfs = self._calculate_min_dbfs_and_noise_floor(
+                progress_callback=stage_callback('noise_floor'), audio=proxy)[1]
+            non_silent_duration = self._calculate_proxy_non_silence_duration(
+                proxy, silence_threshold, progress_callback=stage_callback('silence'))
+        else:
+            # Get min dBFS and the noise floor in one multi-threaded pass
+            min_dbfs, noise_floor_dbfs = self._calculate_min_dbfs_and_noise_floor(
+                progress_callback=stage_callback('noise_floor'))
+            
+            # Calculate non-silence duration using multi-threaded processing
+            non_silent_duration = self._calculate_non_silence_duration(
+                silence_threshold, progress_callback=stage_callback('silence'))
         
         return {
             'max_dbfs': round(max_dbfs, 2),
             'min_dbfs': round(min_dbfs, 2) if isinstance(min_dbfs, (int, float)) and not np.isnan(min_dbfs) else None,
+            'noise_floor_dbfs': round(noise_floor_dbfs, 2) if noise_floor_dbfs is not None else None,
             'duration_seconds': round(duration_seconds, 2),
             'non_silence_seconds': round(non_silent_duration, 2),
             'silence_threshold_db': silence_threshold,
             'sample_rate': self.audio.frame_rate,
             'channels': self.audio.channels,
-            'sample_width': self.audio.sample_width
+            'sample_width': self.audio.sample_width,
+            'channel_statistics': channel_statistics
         }
     
-    def _calculate_max_dbfs(self):
-        """Calculate maximum dBFS using multi-threaded processing."""
-        results = _parallel_process_audio_chunks(
-            self.audio,
-            _process_chunk_for_max_dbfs,
-            _unpack_args_for_max_dbfs
-        )
-        # Return the maximum dBFS from all chunks
-        return max(results)
-    
-    def _calculate_min_dbfs(self):
-        """Calculate minimum dBFS using multi-threaded processing."""
+    def _calculate_min_dbfs_and_noise_floor(self, percentile=NOISE_FLOOR_PERCENTILE, progress_callback=None,
+                                            audio: Optional[AudioSegment] = None):
+        """
+        Calculate minimum dBFS and the noise floor in one multi-threaded pass.
+        
+        The minimum non-zero sample is dominated by single dither samples, so
+        the noise floor is estimated as a low percentile of the windowed RMS
+        level instead, aggregated from per-chunk histograms.
+        
+        Args:
+            percentile: Percentile of the windowed RMS distribution (default: 10)
+            progress_callback: Optional per-chunk callback, see _parallel_process_audio_chunks()
+            audio: Audio to analyze instead of self.audio (e.g. the analysis proxy)
+        
+        Returns:
+            Tuple of (min_dbfs, noise_floor_dbfs); noise_floor_dbfs is None for digital silence
+        """
+        audio = self.audio if audio is None else audio
         results = _parallel_process_audio_chunks(
-            self.audio,
+            audio,
             _process_chunk_for_min_dbfs,
-            _unpack_args_for_min_dbfs
+            _unpack_args_for_min_dbfs,
+            progress_callback=progress_callback
         )
         
-        # Filter out None values and find minimum amplitude
-        valid_results = [r for r in results if r is not None]
-        
-        if len(valid_results) == 0:
-            return -float('inf')
+        histogram = sum(r[1] for r in results)
+        noise_floor = _histogram_percentile(histogram, NOISE_FLOOR_HISTOGRAM_EDGES, percentile)
         
-        min_amplitude = min(valid_results)
-        max_possible = 2 ** (self.audio.sample_width * 8 - 1)
-        ratio = min_amplitude / max_possible
-        
-        if ratio > 0:
-            return 20 * np.log10(ratio)
-        return None
+        # Filter out None values and find minimum amplitude
+        valid_results = [r[0] for r in results if r[0] is not None]
+        return _min_amplitude_to_dbfs(valid_results, audio.sample_width), noise_floor
     
-    def _calculate_non_silence_duration(self, silence_threshold=-50):
+    def _calculate_non_silence_duration(self, silence_threshold=-50, progress_callback=None):
         """Calculate the duration of non-silent parts of the audio using parallel chunk processing."""
         results = _parallel_process_audio_chunks(
             self.audio,
             _process_chunk_for_nonsilence,
             _unpack_args_for_nonsilence,
+            progress_callback=progress_callback,
             silence_threshold=silence_threshold
         )
         
@@ -266,6 +843,107 @@ class AudioProcessor:
         total_nonsilent_ms = sum(results)
         return total_nonsilent_ms / 1000.0
     
+    def _calculate_channel_statistics(self, silence_threshold=-50, channel_parallel: Optional[bool] = None,
+                                      progress_callback=None) -> List[Dict[str, Any]]:
+        """
+        Calculate peak, RMS, non-silence and loudness for every channel in one pass.
+        
+        Args:
+            silence_threshold: Silence threshold in dBFS for the non-silence duration
+            channel_parallel: Also split channels into groups processed as separate
+                              worker tasks (default: for CHANNEL_PARALLEL_MIN_CHANNELS
+                              or more channels)
+            progress_callback: Optional per-task callback, see _parallel_process_audio_chunks()
+        
+        Returns:
+            One dict per channel with channel, label, max_dbfs, rms_dbfs,
+            non_silence_seconds and loudness_lufs (None where undefined)
+        """
+        return self._analyze_channels(silence_threshold, channel_parallel, progress_callback)[0]
+    
+    def _analyze_channels(self, silence_threshold=-50, channel_parallel: Optional[bool] = None,
+                          progress_callback=None, with_proxy: bool = False):
+        """
+        Run the per-channel pass of _calculate_channel_statistics().
+        
+        Args:
+            with_proxy: Also collect the minimum sample and the per-millisecond
+                        power, so min dBFS and the analysis proxy come from this
+                        pass instead of separate full-rate passes
+        
+        Returns:
+            Tuple of (per-channel statistics, min dBFS, analysis proxy); the
+            last two are None unless with_proxy is set
+        """
+        channels = self.audio.channels
+        if channel_parallel is None:
+            channel_parallel = channels >= CHANNEL_PARALLEL_MIN_CHANNELS
+        num_groups = min(channels, ThreadConfig.get_num_threads()) if channel_parallel else 1
+        groups = [list(range(channels))[g::num_groups] for g in range(num_groups)]
+        
+        results = _parallel_process_audio_chunks(
+            self.audio,
+            _process_chunk_for_channel_stats,
+            _unpack_args_for_channel_stats,
+            progress_callback=progress_callback,
+            align_ms=LOUDNESS_SUBBLOCK_MS,
+            split_kwargs=[{'channel_indices': group} for group in groups],
+            preroll_ms=_k_weighting_preroll_ms(self.audio.frame_rate),
+            silence_threshold=silence_threshold,
+            with_proxy=with_proxy
+        )
+        
+        peaks = np.zeros(channels)
+        sum_squares = np.zeros(channels)
+        frames = np.zeros(channels, dtype=np.int64)
+        nonsilent_ms = np.zeros(channels, dtype=np.int64)
+        subblocks: List[List[Any]] = [[] for _ in range(channels)]
+        min_samples = []
+        ms_power = []
+        for chunk_results in results:
+            # Channel groups of a chunk add up to the power of all channels
+            if with_proxy:
+                ms_power.append(sum(result[7] for result in chunk_results))
+            for (group, chunk_peaks, chunk_sums, chunk_frames, chunk_nonsilent, chunk_subblocks,
+                 chunk_min, _) in chunk_results:
+                if chunk_min is not None:
+                    min_samples.append(chunk_min)
+                for column, channel in enumerate(group):
+                    peaks[channel] = max(peaks[channel], chunk_peaks[column])
+                    sum_squares[channel] += chunk_sums[column]
+                    frames[channel] += chunk_frames
+                    nonsilent_ms[channel] += chunk_nonsilent[column]
+                    subblocks[channel].append(chunk_subblocks[:, column])
+        
+        labels = _CHANNEL_LABELS.get(channels)
+        channel_statistics = []
+        for channel in range(channels):
+            loudness = _gated_loudness(np.concatenate(subblocks[channel]))
+            channel_statistics.append({
+                'channel': channel,
+                'label': labels[channel] if labels else str(channel + 1),
+                'max_dbfs': _ratio_to_dbfs(peaks[channel]),
+                'rms_dbfs': _ratio_to_dbfs(math.sqrt(sum_squares[channel] / frames[channel])) if frames[channel] else None,
+                'non_silence_seconds': round(nonsilent_ms[channel] / 1000.0, 2),
+                'loudness_lufs': round(loudness, 2) if loudness is not None else None
+            })
+        if not with_proxy:
+            return channel_statistics, None, None
+        min_dbfs = _min_amplitude_to_dbfs(min_samples, self.audio.sample_width)
+        proxy = _analysis_proxy_from_mean_squares(np.concatenate(ms_power) / channels)
+        return channel_statistics, min_dbfs, proxy
+    
+    def _calculate_proxy_non_silence_duration(self, proxy: AudioSegment, silence_threshold=-50, progress_callback=None):
+        """Calculate the non-silent duration from the analysis proxy (vectorized silence detection)."""
+        results = _parallel_process_audio_chunks(
+            proxy,
+            _process_proxy_chunk_for_nonsilence,
+            _unpack_args_for_proxy_nonsilence,
+            progress_callback=progress_callback,
+            silence_threshold=silence_threshold
+        )
+        return sum(results) / 1000.0
+    
     def _extract_segment(self, start_time: Optional[float] = None, end_time: Optional[float] = None) -> AudioSegment:
         """
         Extract a segment of audio from start_time to end_time.
@@ -281,6 +959,12 @@ class AudioProcessor:
         if start_time is None and end_time is None:
             return self.audio
         
+        # Extract and return the segment
+        start_ms, end_ms = self._segment_bounds_ms(start_time, end_time)
+        return self.audio[start_ms:end_ms]
+    
+    def _segment_bounds_ms(self, start_time: Optional[float] = None, end_time: Optional[float] = None) -> Tuple[int, int]:
+        """Convert start/end times in seconds to millisecond bounds clamped to the audio length."""
         # Convert times to milliseconds (pydub uses milliseconds)
         start_ms = int(start_time * 1000) if start_time is not None else 0
         end_ms = int(end_time * 1000) if end_time is not None else len(self.audio)
@@ -288,84 +972,314 @@ class AudioProcessor:
         # Ensure times are within bounds
         start_ms = max(0, min(start_ms, len(self.audio)))
         end_ms = max(start_ms, min(end_ms, len(self.audio)))
+        return start_ms, end_ms
+    
+    def _render_effect(self, audio: AudioSegment, spec: Dict[str, Any]) -> AudioSegment:
+        """
+        Apply a single validated effect spec to decoded audio.
         
-        # Extract and return the segment
-        return self.audio[start_ms:end_ms]
+        Args:
+            audio: AudioSegment to process
+            spec: Effect spec as returned by build_effect_chain()
+        
+        Returns:
+            Processed AudioSegment
+        """
+        effect = spec['effect']
+        if effect == 'compressor':
+            # Apply dynamic range compression (pydub's algorithm, see Compressor)
+            return _apply_dynamics(audio, [spec])
+        if effect == 'limiter':
+            # A limiter is essentially a compressor with a very high ratio
+            # We use ratio of 100:1 for limiting
+            limited = _apply_dynamics(audio, [{
+                'effect': 'compressor',
+                'threshold': spec['threshold'],
+                'ratio': 100.0,
+                'attack': 0.1,  # Very fast attack for limiting
+                'release': spec['release']
+            }])
+            # Normalize to prevent clipping
+            return normalize(limited, headroom=0.1)
+        if effect == 'gain':
+            return audio.apply_gain(spec['gain_db'])
+        if effect == 'normalize':
+            return normalize(audio, headroom=spec['headroom'])
+        raise ValueError(f"Unsupported effect: {effect}")
+    
+    def _render_chain(self, audio: AudioSegment, chain: List[Dict[str, Any]], progress_callback: Optional[Callable[..., None]] = None) -> AudioSegment:
+        """Run validated effect specs in order on decoded audio (no intermediate encodes)."""
+        if progress_callback is not None:
+            progress_callback('render', 0, len(chain))
+        for done, spec in enumerate(chain, start=1):
+            audio = self._render_effect(audio, spec)
+            if progress_callback is not None:
+                progress_callback('render', done, len(chain))
+        return audio
     
-    def apply_compressor(self, threshold: float = -20.0, ratio: float = 4.0, attack: float = 5.0, release: float = 50.0, start_time: Optional[float] = None, end_time: Optional[float] = None) -> str:
+    def apply_chain(self, chain: List[Dict[str, Any]], start_time: Optional[float] = None, end_time: Optional[float] = None, output_path: Optional[str] = None, progress_callback: Optional[Callable[..., None]] = None) -> str:
         """
-        Apply compression to audio.
+        Apply an ordered chain of effects in a single render pass.
+        
+        The audio is decoded once, every effect runs on the in-memory samples
+        and the result is encoded to MP3 once at the end, so chaining effects
+        causes no intermediate generation loss.
         
         Args:
-            threshold: Threshold in dBFS (default: -20)
-            ratio: Compression ratio (default: 4)
-            attack: Attack time in ms (default: 5)
-            release: Release time in ms (default: 50)
+            chain: List of effect specs, e.g. [{'effect': 'compressor', 'ratio': 4}, {'effect': 'limiter'}]
             start_time: Start time in seconds for processing (default: None - process from beginning)
             end_time: End time in seconds for processing (default: None - process to end)
+            output_path: Path to write the result to (default: None - derived from the input name in the temp directory)
+            progress_callback: Optional callback(stage, done, total) for the 'render' (effects done) and 'encode' stages
         
         Returns:
             Path to processed audio file
+        
+        Raises:
+            ValueError: If the chain is invalid
         """
+        chain = build_effect_chain(chain)
+        
         # Extract segment if start_time or end_time is specified
         audio_to_process = self._extract_segment(start_time, end_time)
+        processed = self._render_chain(audio_to_process, chain, progress_callback)
         
-        # Apply dynamic range compression using pydub
-        compressed = compress_dynamic_range(
-            audio_to_process,
-            threshold=threshold,
-            ratio=ratio,
-            attack=attack,
-            release=release
-        )
-        
-        # Generate output filename
-        base_name = os.path.splitext(os.path.basename(self.filepath))[0]
-        output_path = os.path.join(
-            tempfile.gettempdir(),
-            f"{base_name}_compressed.mp3"
-        )
+        # Generate output filename unless the caller chose one
+        if output_path is None:
+            base_name = os.path.splitext(os.path.basename(self.filepath))[0]
+            output_path = os.path.join(
+                tempfile.gettempdir(),
+                f"{base_name}_{effect_chain_suffix(chain)}.mp3"
+            )
         
         # Export as mp3
-        compressed.export(output_path, format='mp3')
+        if progress_callback is not None:
+            progress_callback('encode', 0, 1)
+        processed.export(output_path, format='mp3')
+        if progress_callback is not None:
+            progress_callback('encode', 1, 1)
         return output_path
     
-    def apply_limiter(self, threshold: float = -1.0, release: float = 50.0, start_time: Optional[float] = None, end_time: Optional[float] = None) -> str:
+    def _render_dynamics(self, chain: List[Dict[str, Any]], start_ms: int, end_ms: int, base_render: Optional[AudioSegment] = None, base_state: Optional[RenderState] = None, progress_callback: Optional[Callable[..., None]] = None) -> Tuple[AudioSegment, RenderState]:
         """
-        Apply limiting to audio (extreme compression with high ratio).
+        Render a chain of compressor and gain effects, recording its state.
+        
+        Without a base render the whole file is rendered. With one, only
+        start_ms..end_ms (plus the pre-roll and tail rerender_region()
+        describes) is rendered and spliced into it.
+        
+        Returns:
+            Tuple of the full-length AudioSegment and its RenderState
+        
+        Raises:
+            ValueError: If the chain contains a global effect
+        """
+        global_effects = [spec['effect'] for spec in chain if spec['effect'] in GLOBAL_EFFECTS]
+        if global_effects:
+            raise ValueError(f"{', '.join(global_effects)} depends on the whole file and cannot be re-rendered per region")
+        
+        audio = self.audio
+        frame_rate = audio.frame_rate
+        source = _samples_from_bytes(audio.raw_data, audio.sample_width).reshape(-1, audio.channels)
+        if base_render is None:
+            output = np.empty_like(source)
+            state = RenderState(frame_rate)
+        else:
+            output = _samples_from_bytes(base_render.raw_data, audio.sample_width).reshape(-1, audio.channels).copy()
+            state = base_state.copy() if base_state is not None else RenderState(frame_rate)
+        total = min(len(source), len(output))
+        start = min(start_ms * frame_rate // 1000, total)
+        end = min(end_ms * frame_rate // 1000, total)
+        
+        dynamics = DynamicsChain(chain, frame_rate, audio.sample_width)
+        interval = dynamics.interval
+        # Resume the compressors at the last checkpoint before the region that
+        # was rendered with this chain; the attenuation is only known to be 0
+        # at the start of the file
+        checkpoint = start // interval if dynamics.compressors else 0
+        while checkpoint > 0 and (base_state is None or base_state.get(checkpoint, chain) is None):
+            checkpoint -= 1
+        if dynamics.compressors:
+            first_input = dynamics.start(checkpoint * interval, base_state.get(checkpoint, chain) if checkpoint > 0 else None)
+        else:
+            first_input = dynamics.start(start)
+        position = first_input
+        expected_blocks = max(1, -(-(end - first_input) // interval))
+        if progress_callback is not None:
+            progress_callback('render', 0, expected_blocks)
+        
+        def render_until(target):
+            """Feed the source up to a frame, writing the output from the region start on."""
+            nonlocal position
+            while position < target:
+                stop = min(target, (position // interval + 1) * interval)
+                block = dynamics.feed(source[position:stop].astype(np.int64))
+                position = stop
+                keep = max(start, stop - len(block))
+                if keep < stop:
+                    output[keep:stop] = block[len(block) - (stop - keep):]
+                if progress_callback is not None:
+                    done = -(-(position - first_input) // interval)
+                    progress_callback('render', min(done, expected_blocks), expected_blocks)
+        
+        render_until(end)
+        render_end = end
+        if dynamics.compressors and end < total:
+            # Keep rendering until the state matches the base render's at a
+            # checkpoint; from there on the base render is what this chain
+            # would produce anyway
+            checkpoint = -(-max(end, 1) // interval)
+            while True:
+                if checkpoint * interval >= total:
+                    render_until(total)
+                    render_end = total
+                    break
+                base_values = base_state.get(checkpoint, chain) if base_state is not None else None
+                if base_values is None:
+                    # The base render was made with another chain here, so the
+                    # states never match: crossfade back into it instead
+                    fade_end = min(total, position + effect_chain_settling_ms(chain) * frame_rate // 1000)
+                    base_tail = output[position:fade_end].astype(np.float64)
+                    fade_start = position
+                    render_until(fade_end)
+                    fade = np.linspace(0.0, 1.0, fade_end - fade_start)[:, None]
+                    mixed = output[fade_start:fade_end] * (1 - fade) + base_tail * fade
+                    output[fade_start:fade_end] = np.round(mixed)
+                    render_end = fade_end
+                    break
+                render_until(checkpoint * interval)
+                if np.allclose(dynamics.checkpoint(checkpoint), base_values, rtol=0, atol=1e-9):
+                    render_end = position
+                    break
+                checkpoint += 1
+        if progress_callback is not None:
+            progress_callback('render', expected_blocks, expected_blocks)
+        
+        # The checkpoints inside the re-rendered range now belong to this chain
+        for index in range(-(-max(start, 1) // interval), -(-render_end // interval)):
+            values = dynamics.checkpoint(index)
+            if values is not None:
+                state.set(index, chain, values)
+        
+        rendered = AudioSegment(data=output.tobytes(), sample_width=audio.sample_width,
+                                frame_rate=frame_rate, channels=audio.channels)
+        return rendered, state
+    
+    def rerender_region(self, base_render: AudioSegment, chain: List[Dict[str, Any]], start_time: Optional[float] = None, end_time: Optional[float] = None, progress_callback: Optional[Callable[..., None]] = None, base_state: Optional[RenderState] = None) -> Tuple[AudioSegment, RenderState]:
+        """
+        Re-render only an edited region and splice it into an existing full render.
+        
+        The compressor holds its gain reduction while the level is below the
+        threshold, so no fixed pre-roll lets it settle. Instead rendering
+        resumes from the compressor state stored with the base render at the
+        last checkpoint before the region (from the start of the file if the
+        base render was made with another chain there), so the region starts
+        exactly as in a full render. After the region, rendering continues
+        until the state matches the base render's at a checkpoint; where the
+        base render was made with another chain it never does, and the render
+        is crossfaded back into it over the chain's settling time instead.
         
         Args:
-            threshold: Threshold in dBFS (default: -1)
+            base_render: Full-length render of this file to splice into
+            chain: List of effect specs
+            start_time: Start time in seconds of the edited region (default: None - from beginning)
+            end_time: End time in seconds of the edited region (default: None - to end)
+            progress_callback: Optional callback(stage, done, total) for the 'render' stage
+            base_state: RenderState saved with the base render (default: None - unknown)
+        
+        Returns:
+            Tuple of the full-length AudioSegment with the region replaced and its RenderState
+        
+        Raises:
+            ValueError: If the chain is invalid, contains a global effect or
+                        the base render does not match the source audio
+        """
+        chain = build_effect_chain(chain)
+        if abs(len(base_render) - len(self.audio)) > 1:
+            raise ValueError('Base render does not match the source audio')
+        if base_state is not None and base_state.frame_rate != self.audio.frame_rate:
+            base_state = None
+        
+        start_ms, end_ms = self._segment_bounds_ms(start_time, end_time)
+        return self._render_dynamics(chain, start_ms, end_ms, base_render, base_state, progress_callback)
+    
+    def apply_chain_incremental(self, chain: List[Dict[str, Any]], render_path: str, output_path: str, base_render_path: Optional[str] = None, start_time: Optional[float] = None, end_time: Optional[float] = None, progress_callback: Optional[Callable[..., None]] = None, state_path: Optional[str] = None, base_state_path: Optional[str] = None) -> str:
+        """
+        Apply an effect chain to a region, splicing it into the last full render.
+        
+        Without a base render (or without a region) the whole file is rendered.
+        Either way the resulting full render is written as WAV to render_path,
+        and its compressor state (a RenderState) to state_path, to serve as
+        the base of the next edit, and as MP3 to output_path.
+        
+        Args:
+            chain: List of effect specs
+            render_path: Path to write the full-length PCM render (WAV) to
+            output_path: Path to write the MP3 result to
+            base_render_path: Path of the previous full render (WAV), if any
+            start_time: Start time in seconds of the edited region (default: None - from beginning)
+            end_time: End time in seconds of the edited region (default: None - to end)
+            progress_callback: Optional callback(stage, done, total) for the 'render' and 'encode' stages
+            state_path: Path to write the render's state (JSON) to (default: None - not saved)
+            base_state_path: Path of the state saved with the base render, if any
+        
+        Returns:
+            Path to processed audio file
+        """
+        chain = build_effect_chain(chain)
+        if base_render_path is None or (start_time is None and end_time is None):
+            rendered, state = self._render_dynamics(chain, 0, len(self.audio), progress_callback=progress_callback)
+        else:
+            base_render = AudioSegment.from_wav(base_render_path)
+            base_state = RenderState.load(base_state_path) if base_state_path is not None else None
+            rendered, state = self.rerender_region(base_render, chain, start_time, end_time, progress_callback,
+                                                   base_state=base_state)
+        
+        if progress_callback is not None:
+            progress_callback('encode', 0, 2)
+        rendered.export(render_path, format='wav')
+        if state_path is not None:
+            state.save(state_path)
+        if progress_callback is not None:
+            progress_callback('encode', 1, 2)
+        rendered.export(output_path, format='mp3')
+        if progress_callback is not None:
+            progress_callback('encode', 2, 2)
+        return output_path
+    
+    
+    def apply_compressor(self, threshold: float = -20.0, ratio: float = 4.0, attack: float = 5.0, release: float = 50.0, start_time: Optional[float] = None, end_time: Optional[float] = None, output_path: Optional[str] = None) -> str:
+        """
+        Apply compression to audio.
+        
+        Args:
+            threshold: Threshold in dBFS (default: -20)
+            ratio: Compression ratio (default: 4)
+            attack: Attack time in ms (default: 5)
             release: Release time in ms (default: 50)
             start_time: Start time in seconds for processing (default: None - process from beginning)
             end_time: End time in seconds for processing (default: None - process to end)
+            output_path: Path to write the result to (default: None - derived from the input name in the temp directory)
         
         Returns:
             Path to processed audio file
         """
-        # Extract segment if start_time or end_time is specified
-        audio_to_process = self._extract_segment(start_time, end_time)
-        
-        # A limiter is essentially a compressor with a very high ratio
-        # We use ratio of 100:1 for limiting
-        limited = compress_dynamic_range(
-            audio_to_process,
-            threshold=threshold,
-            ratio=100,
-            attack=0.1,  # Very fast attack for limiting
-            release=release
-        )
-        
-        # Normalize to prevent clipping
-        limited = normalize(limited, headroom=0.1)
+        chain = [{'effect': 'compressor', 'threshold': threshold, 'ratio': ratio, 'attack': attack, 'release': release}]
+        return self.apply_chain(chain, start_time, end_time, output_path)
+    
+    def apply_limiter(self, threshold: float = -1.0, release: float = 50.0, start_time: Optional[float] = None, end_time: Optional[float] = None, output_path: Optional[str] = None) -> str:
+        """
+        Apply limiting to audio (extreme compression with high ratio).
         
-        # Generate output filename
-        base_name = os.path.splitext(os.path.basename(self.filepath))[0]
-        output_path = os.path.join(
-            tempfile.gettempdir(),
-            f"{base_name}_limited.mp3"
-        )
+        Args:
+            threshold: Threshold in dBFS (default: -1)
+            release: Release time in ms (default: 50)
+            start_time: Start time in seconds for processing (default: None - process from beginning)
+            end_time: End time in seconds for processing (default: None - process to end)
+            output_path: Path to write the result to (default: None - derived from the input name in the temp directory)
         
-        # Export as mp3
-        limited.export(output_path, format='mp3')
-        return output_path
+        Returns:
+            Path to processed audio file
+        """
+        chain = [{'effect': 'limiter', 'threshold': threshold, 'release': release}]
+        return self.apply_chain(chain, start_time, end_time, output_path)
@@ -0,0 +1,336 @@
+import os
+import time
+import uuid
+import hashlib
+import threading
+import concurrent.futures
+from typing import Optional, Callable, Dict, Any, BinaryIO, List
+
+# Size of the blocks read from a part's request stream
+_STREAM_BLOCK_SIZE = 1024 * 1024
+
+
+class UploadSession:
+    """State of one resumable upload: expected layout, received parts and running hash."""
+
+    def __init__(self, upload_id: str, filename: str, extension: str, size: int, part_size: int, temp_path: str,
+                 progress_id: Optional[str] = None):
+        self.upload_id = upload_id
+        self.filename = filename
+        self.extension = extension
+        self.size = size
+        self.part_size = part_size
+        self.total_parts = max(1, -(-size // part_size))
+        self.temp_path = temp_path
+        self.progress_id = progress_id
+        self.received: set = set()
+        # Parts whose bytes are being written right now (not hashed until done)
+        self.writing: set = set()
+        # SHA-256 over the contiguous prefix of received parts, advanced as
+        # soon as that prefix grows (out-of-order parts wait for the gap to fill)
+        self.hasher = hashlib.sha256()
+        self.hashed_parts = 0
+        self.content_hash: Optional[str] = None
+        self.updated_at = time.time()
+        self.future: Optional[concurrent.futures.Future] = None
+        self.lock = threading.Lock()
+
+    def part_length(self, index: int) -> int:
+        """Expected byte length of a part (the last part may be shorter)."""
+        if index == self.total_parts - 1:
+            return self.size - index * self.part_size
+        return self.part_size
+
+    def missing_parts(self) -> List[int]:
+        return [i for i in range(self.total_parts) if i not in self.received]
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Public status of the upload (no file paths)."""
+        return {
+            'upload_id': self.upload_id,
+            'filename': self.filename,
+            'size': self.size,
+            'part_size': self.part_size,
+            'total_parts': self.total_parts,
+            'received_parts': sorted(self.received),
+            'complete': len(self.received) == self.total_parts
+        }
+
+
+class ChunkedUploadManager:
+    """
+    Resumable chunked uploads (init, PUT part, complete).
+
+    Each part is written straight to its final offset in a preallocated file,
+    so parts can arrive in any order and be retried after a dropped
+    connection. The SHA-256 is updated as contiguous parts arrive, and once
+    the final part lands ``on_complete`` (e.g. decode and statistics) is
+    started in the background, so ``complete()`` usually only has to wait for
+    work that is already running.
+
+    The preallocated files of uploads still receiving parts are reserved
+    disk space: the number of such uploads and their total size are capped.
+    """
+
+    def __init__(self, temp_path_factory: Callable[[str], str],
+                 on_complete: Callable[[UploadSession], Dict[str, Any]],
+                 max_size: int, default_part_size: int = 8 * 1024 * 1024,
+                 min_part_size: int = 256 * 1024, max_part_size: int = 32 * 1024 * 1024,
+                 ttl_seconds: float = 3600.0, max_workers: int = 2, max_sessions: Optional[int] = 8,
+                 max_reserved_bytes: Optional[int] = None):
+        """
+        Args:
+            temp_path_factory: Returns a unique temporary path for a file extension
+            on_complete: Called in the background with the finished session; its return value is the upload result
+            max_size: Maximum total upload size in bytes
+            default_part_size: Part size used when the client does not choose one
+            min_part_size: Smallest part size a client may choose
+            max_part_size: Largest part size a client may choose
+            ttl_seconds: Seconds an idle, unfinished upload is kept before it is discarded
+            max_workers: Number of uploads finalized concurrently
+            max_sessions: Maximum number of uploads receiving parts at once (None disables the limit)
+            max_reserved_bytes: Maximum total size of the uploads receiving parts (None disables the limit)
+        """
+        self.temp_path_factory = temp_path_factory
+        self.on_complete = on_complete
+        self.max_size = max_size
+        self.default_part_size = default_part_size
+        self.min_part_size = min_part_size
+        self.max_part_size = max_part_size
+        self.ttl_seconds = ttl_seconds
+        self.max_sessions = max_sessions
+        self.max_reserved_bytes = max_reserved_bytes
+        self._sessions: Dict[str, UploadSession] = {}
+        self._lock = threading.Lock()
+        self._executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix='chunked-upload'
+        )
+
+    def init(self, filename: str, extension: str, size: int, part_size: Optional[int] = None,
+             progress_id: Optional[str] = None) -> UploadSession:
+        """
+        Start a new upload and preallocate its file.
+
+        Args:
+            filename: User-facing filename
+            extension: File extension of the upload
+            size: Total size in bytes
+            part_size: Size of every part but the last (default: default_part_size)
+            progress_id: Optional progress ID reported on while the upload is finalized
+
+        Raises:
+            ValueError: If the size or part size is out of range, or the
+                upload would exceed max_sessions or max_reserved_bytes
+        """
+        self.purge_expired()
+        if size <= 0 or size > self.max_size:
+            raise ValueError(f'size must be between 1 and {self.max_size} bytes')
+        part_size = self.default_part_size if part_size is None else part_size
+        if part_size < self.min_part_size or part_size > self.max_part_size:
+            raise ValueError(f'part_size must be between {self.min_part_size} and {self.max_part_size} bytes')
+
+        temp_path = self.temp_path_factory(extension)
+        session = UploadSession(str(uuid.uuid4()), filename, extension, size, part_size, temp_path, progress_id)
+        # Reserve the space before preallocating, so concurrent inits cannot overshoot the limits
+        with self._lock:
+            receiving = [s for s in self._sessions.values() if s.future is None]
+            if self.max_sessions is not None and len(receiving) >= self.max_sessions:
+                raise ValueError('Too many uploads in progress, try again later')
+            if self.max_reserved_bytes is not None and \
+                    sum(s.size for s in receiving) + size > self.max_reserved_bytes:
+                raise ValueError('Not enough storage space for this upload, try again later')
+            self._sessions[session.upload_id] = session
+        try:
+            with open(temp_path, 'wb') as f:
+                f.truncate(size)
+        except BaseException:
+            with self._lock:
+                self._sessions.pop(session.upload_id, None)
+            self._remove_file(temp_path)
+            raise
+        return session
+
+    def reserved_bytes(self) -> int:
+        """Total size of the preallocated files of uploads still receiving parts."""
+        with self._lock:
+            return sum(s.size for s in self._sessions.values() if s.future is None)
+
+    def get(self, upload_id: str) -> Optional[UploadSession]:
+        """Return the session for an upload ID, or None if unknown or expired."""
+        with self._lock:
+            return self._sessions.get(upload_id)
+
+    def write_part(self, upload_id: str, index: int, stream: BinaryIO) -> Optional[UploadSession]:
+        """
+        Write one part at its final offset.
+
+        Re-sending a part that was received but not hashed yet overwrites it,
+        which makes retries after a dropped connection safe. A part that was
+        already hashed can only be re-sent with the same bytes, so the stored
+        file always matches the content hash it is filed under.
+
+        Returns:
+            The updated session, or None if the upload ID is unknown
+
+        Raises:
+            ValueError: If the index is out of range, the part has the wrong
+                length, a hashed part is re-sent with different bytes, or the
+                part is being uploaded by another request
+        """
+        session = self.get(upload_id)
+        if session is None:
+            return None
+        if index < 0 or index >= session.total_parts:
+            raise ValueError(f'part index must be between 0 and {session.total_parts - 1}')
+
+        with session.lock:
+            if session.future is not None:
+                raise ValueError('upload is already complete')
+            hashed = index < session.hashed_parts
+            if not hashed:
+                if index in session.writing:
+                    raise ValueError(f'part {index} is already being uploaded')
+                # Not received (or hashed) again until the new bytes are complete
+                session.received.discard(index)
+                session.writing.add(index)
+
+        expected = session.part_length(index)
+        if hashed:
+            self._verify_part(session, index, stream, expected)
+            with session.lock:
+                session.updated_at = time.time()
+            return session
+
+        try:
+            written = self._write_part_bytes(session, index, stream, expected)
+            if written != expected:
+                raise ValueError(f'part {index} must be exactly {expected} bytes')
+        except BaseException:
+            with session.lock:
+                session.writing.discard(index)
+            raise
+
+        with session.lock:
+            session.writing.discard(index)
+            session.received.add(index)
+            session.updated_at = time.time()
+            self._advance_hash(session)
+            if len(session.received) == session.total_parts and session.future is None:
+                # Final part landed: start decoding and analysis right away
+                session.future = self._executor.submit(self.on_complete, session)
+        return session
+
+    @staticmethod
+    def _write_part_bytes(session: UploadSession, index: int, stream: BinaryIO, expected: int) -> int:
+        """Copy a part from the stream to its offset. Returns the number of bytes read."""
+        written = 0
+        with open(session.temp_path, 'r+b') as f:
+            f.seek(index * session.part_size)
+            while True:
+                # Read at most one byte past the expected length to detect oversized parts
+                block = stream.read(min(_STREAM_BLOCK_SIZE, expected + 1 - written))
+                if not block:
+                    break
+                written += len(block)
+                if written > expected:
+                    break
+                f.write(block)
+        return written
+
+    @staticmethod
+    def _verify_part(session: UploadSession, index: int, stream: BinaryIO, expected: int):
+        """Check that a re-sent, already hashed part has the stored bytes."""
+        read = 0
+        matches = True
+        with open(session.temp_path, 'rb') as f:
+            f.seek(index * session.part_size)
+            while True:
+                block = stream.read(min(_STREAM_BLOCK_SIZE, expected + 1 - read))
+                if not block:
+                    break
+                read += len(block)
+                if read > expected:
+                    break
+                if matches and f.read(len(block)) != block:
+                    matches = False
+        if read != expected:
+            raise ValueError(f'part {index} must be exactly {expected} bytes')
+        if not matches:
+            raise ValueError(f'part {index} was already received with different content')
+
+    def _advance_hash(self, session: UploadSession):
+        """Hash every part of the contiguous received prefix not hashed yet."""
+        if session.hashed_parts not in session.received:
+            return
+        with open(session.temp_path, 'rb') as f:
+            f.seek(session.hashed_parts * session.part_size)
+            while session.hashed_parts in session.received:
+                remaining = session.part_length(session.hashed_parts)
+                while remaining > 0:
+                    block = f.read(min(_STREAM_BLOCK_SIZE, remaining))
+                    if not block:
+                        break
+                    session.hasher.update(block)
+                    remaining -= len(block)
+                session.hashed_parts += 1
+        if session.hashed_parts == session.total_parts:
+            session.content_hash = session.hasher.hexdigest()
+
+    def complete(self, upload_id: str, timeout: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """
+        Wait for the background finalization of a fully received upload.
+
+        Returns:
+            The result of ``on_complete``, or None if the upload ID is unknown
+
+        Raises:
+            ValueError: If parts are still missing
+            Exception: Whatever ``on_complete`` raised
+        """
+        session = self.get(upload_id)
+        if session is None:
+            return None
+        if session.future is None:
+            raise ValueError(f'missing parts: {session.missing_parts()}')
+        try:
+            return session.future.result(timeout=timeout)
+        finally:
+            with self._lock:
+                self._sessions.pop(upload_id, None)
+
+    def abort(self, upload_id: str) -> bool:
+        """Discard an unfinished upload and its partial file."""
+        with self._lock:
+            session = self._sessions.pop(upload_id, None)
+        if session is None:
+            return False
+        if session.future is None:
+            self._remove_file(session.temp_path)
+        return True
+
+    def purge_expired(self) -> int:
+        """
+        Discard uploads idle for longer than the TTL. Returns the number removed.
+
+        Unfinished uploads lose their partial file; finished ones whose result
+        was never collected are only forgotten (their file belongs to on_complete).
+        """
+        cutoff = time.time() - self.ttl_seconds
+        with self._lock:
+            expired = [s for s in self._sessions.values()
+                       if (s.future is None or s.future.done()) and s.updated_at < cutoff]
+            for session in expired:
+                del self._sessions[session.upload_id]
+        for session in expired:
+            if session.future is None:
+                self._remove_file(session.temp_path)
+        return len(expired)
+
+    @staticmethod
+    def _remove_file(path: str):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            print(f"Error removing partial upload: {str(e)}")
@@ -0,0 +1,269 @@
+import json
+import os
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+from pydub.utils import db_to_float
+
+
+# Compressor states of a render are recorded this often (see RenderState)
+CHECKPOINT_SECONDS = 1
+
+
+class Compressor:
+    """
+    pydub's compress_dynamic_range() as a resumable stream processor.
+
+    Produces the same samples as pydub (up to the rounding of the last bit)
+    for audio fed in blocks of any size, but vectorized with NumPy. Its state
+    is the current attenuation in dB plus the look-back window of input
+    frames. pydub holds the attenuation while the level stays below the
+    threshold, so the state at a frame depends on everything before it.
+    """
+
+    def __init__(self, threshold: float, ratio: float, attack: float, release: float,
+                 frame_rate: int, sample_width: int, attenuation: float = 0.0):
+        """
+        Args:
+            threshold: Threshold in dBFS
+            ratio: Compression ratio
+            attack: Attack time in ms (also the length of the RMS window)
+            release: Release time in ms
+            frame_rate: Sample rate of the audio
+            sample_width: Bytes per sample of the audio
+            attenuation: Attenuation in dB to resume from (default: 0.0 - start of the file)
+        """
+        max_amplitude = float(2 ** (8 * sample_width - 1))
+        self.thresh_rms = max_amplitude * db_to_float(threshold)
+        self.ratio = ratio
+        self.look_frames = int(attack * (frame_rate / 1000.0))
+        self.attack_frames = attack * (frame_rate / 1000.0)
+        self.release_frames = release * (frame_rate / 1000.0)
+        self.sample_width = sample_width
+        self.attenuation = attenuation
+        # Last look_frames input frames (fewer at the start of the file)
+        self.history: Optional[np.ndarray] = None
+
+    def prime(self, frames: np.ndarray):
+        """Fill the look-back window with input frames that are not processed themselves."""
+        if self.history is not None:
+            frames = np.concatenate([self.history, frames])
+        self.history = frames[len(frames) - min(self.look_frames, len(frames)):]
+
+    def process(self, frames: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Compress the next block of frames.
+
+        Args:
+            frames: Integer samples of shape (frames, channels)
+
+        Returns:
+            Tuple of the compressed frames and the attenuation in dB applied to each frame
+        """
+        count = len(frames)
+        history = self.history if self.history is not None else frames[:0]
+        extended = np.concatenate([history, frames])
+
+        # RMS of the look_frames frames before each frame, as audioop.rms()
+        # computes it (exact integer sums up to 16-bit samples)
+        power_dtype = np.int64 if self.sample_width <= 2 else np.float64
+        power = np.square(extended.astype(power_dtype)).sum(axis=1)
+        cumulative = np.concatenate([np.zeros(1, dtype=power_dtype), np.cumsum(power)])
+        window_end = np.arange(len(history), len(extended))
+        window_start = np.maximum(window_end - self.look_frames, 0)
+        samples = (window_end - window_start) * frames.shape[1]
+        rms = np.zeros(count)
+        counted = samples > 0
+        rms[counted] = np.floor(np.sqrt(
+            (cumulative[window_end[counted]] - cumulative[window_start[counted]]) / samples[counted]))
+
+        over = rms > self.thresh_rms
+        max_attenuation = np.zeros(count)
+        max_attenuation[over] = (1 - (1.0 / self.ratio)) * 20 * np.log10(rms[over] / self.thresh_rms)
+
+        # Below the threshold the attenuation is held, so the envelope only
+        # needs to be stepped on the frames above it
+        active = np.flatnonzero(max_attenuation > 0)
+        peaks = max_attenuation[active]
+        with np.errstate(divide='ignore'):
+            increments = peaks / self.attack_frames
+            decrements = peaks / self.release_frames
+        values = []
+        attenuation = self.attenuation
+        for peak, increment, decrement in zip(peaks.tolist(), increments.tolist(), decrements.tolist()):
+            if attenuation <= peak:
+                attenuation = min(attenuation + increment, peak)
+            else:
+                attenuation = max(attenuation - decrement, 0.0)
+            values.append(attenuation)
+
+        if values:
+            last_active = np.full(count, -1)
+            last_active[active] = np.arange(len(active))
+            last_active = np.maximum.accumulate(last_active)
+            applied = np.where(last_active >= 0, np.asarray(values)[last_active], self.attenuation)
+        else:
+            applied = np.full(count, self.attenuation)
+
+        output = scale_samples(frames, np.power(10.0, -applied / 20)[:, None], self.sample_width)
+        self.attenuation = attenuation
+        self.history = extended[len(extended) - min(self.look_frames, len(extended)):]
+        return output, applied
+
+
+def scale_samples(frames: np.ndarray, factor, sample_width: int) -> np.ndarray:
+    """Multiply integer samples by a factor, rounding and clipping like audioop.mul()."""
+    max_amplitude = 2 ** (8 * sample_width - 1)
+    return np.clip(np.floor(frames * factor), -max_amplitude, max_amplitude - 1).astype(np.int64)
+
+
+class DynamicsChain:
+    """
+    Run a chain of compressor and gain effects over a stream of frames.
+
+    Gains are stateless; every compressor keeps its own state. To resume at
+    a checkpoint, each compressor starts as many frames early as the
+    compressors after it look back, so their look-back windows are filled
+    with the output of the compressor before them. The attenuation of each
+    compressor is recorded at those offsets from every checkpoint.
+    """
+
+    def __init__(self, chain: List[Dict[str, Any]], frame_rate: int, sample_width: int):
+        """
+        Args:
+            chain: Validated effect specs (compressor and gain only)
+            frame_rate: Sample rate of the audio
+            sample_width: Bytes per sample of the audio
+
+        Raises:
+            ValueError: If the chain contains another effect
+        """
+        self.sample_width = sample_width
+        self.interval = frame_rate * CHECKPOINT_SECONDS
+        self.stages: List[Any] = []
+        for spec in chain:
+            if spec['effect'] == 'compressor':
+                self.stages.append(Compressor(spec['threshold'], spec['ratio'], spec['attack'], spec['release'],
+                                              frame_rate, sample_width))
+            elif spec['effect'] == 'gain':
+                self.stages.append(db_to_float(spec['gain_db']))
+            else:
+                raise ValueError(f"{spec['effect']} cannot be rendered as a stream")
+        self.compressors = [stage for stage in self.stages if isinstance(stage, Compressor)]
+        self.preroll_frames = sum(compressor.look_frames for compressor in self.compressors)
+        # Frames each compressor runs ahead of the chain output
+        self._leads = [sum(c.look_frames for c in self.compressors[i + 1:]) for i in range(len(self.compressors))]
+        self._positions = [0] * len(self.compressors)
+        self._priming = [0] * len(self.compressors)
+        self._recorded: List[Dict[int, float]] = [{} for _ in self.compressors]
+
+    def start(self, frame: int, state: Optional[List[float]] = None) -> int:
+        """
+        Prepare to produce output from a frame.
+
+        Args:
+            frame: First output frame (0, or a checkpoint frame when state is given)
+            state: Attenuations recorded at that checkpoint (None at the start of the file)
+
+        Returns:
+            Index of the first input frame to feed
+        """
+        if frame > 0 and self.compressors and state is None:
+            raise ValueError('Resuming a compressor needs its state')
+        for i, compressor in enumerate(self.compressors):
+            compressor.attenuation = state[i] if state is not None else 0.0
+            compressor.history = None
+            self._positions[i] = frame - self._leads[i] if frame > 0 else 0
+            self._priming[i] = compressor.look_frames if frame > 0 else 0
+        return frame - self.preroll_frames if frame > 0 else 0
+
+    def feed(self, frames: np.ndarray) -> np.ndarray:
+        """Process the next input frames; returns the output frames they complete."""
+        index = 0
+        for stage in self.stages:
+            if not isinstance(stage, Compressor):
+                frames = scale_samples(frames, stage, self.sample_width)
+                continue
+            if self._priming[index]:
+                primed = min(self._priming[index], len(frames))
+                stage.prime(frames[:primed])
+                self._priming[index] -= primed
+                frames = frames[primed:]
+            before = stage.attenuation
+            frames, applied = stage.process(frames)
+            self._record(index, before, applied)
+            self._positions[index] += len(applied)
+            index += 1
+        return frames
+
+    def _record(self, index: int, before: float, applied: np.ndarray):
+        lead = self._leads[index]
+        position = self._positions[index]
+        offset = (-(position + lead)) % self.interval
+        # The state before the frame after the block is known as well
+        for j in range(offset, len(applied) + 1, self.interval):
+            checkpoint = (position + j + lead) // self.interval
+            if checkpoint > 0:
+                self._recorded[index][checkpoint] = before if j == 0 else float(applied[j - 1])
+
+    def checkpoint(self, index: int) -> Optional[List[float]]:
+        """Return the attenuations recorded for a checkpoint, or None if not reached yet."""
+        if not all(index in recorded for recorded in self._recorded):
+            return None
+        return [recorded[index] for recorded in self._recorded]
+
+
+class RenderState:
+    """
+    Compressor states of a full render, recorded every CHECKPOINT_SECONDS.
+
+    Saved as JSON next to the render, so an incremental edit can resume the
+    compressors where the region starts. A render may be stitched together
+    from several edits, so every checkpoint also records its chain.
+    """
+
+    def __init__(self, frame_rate: int, checkpoints: Optional[Dict[int, Tuple[List[Dict[str, Any]], List[float]]]] = None):
+        self.frame_rate = frame_rate
+        self.interval = frame_rate * CHECKPOINT_SECONDS
+        self.checkpoints = dict(checkpoints or {})
+
+    def get(self, index: int, chain: List[Dict[str, Any]]) -> Optional[List[float]]:
+        """Return the attenuations at a checkpoint if it was rendered with this chain."""
+        entry = self.checkpoints.get(index)
+        if entry is None or entry[0] != chain:
+            return None
+        return entry[1]
+
+    def set(self, index: int, chain: List[Dict[str, Any]], values: List[float]):
+        self.checkpoints[index] = (chain, values)
+
+    def copy(self) -> 'RenderState':
+        return RenderState(self.frame_rate, self.checkpoints)
+
+    def save(self, path: str):
+        """Write the state as JSON (each distinct chain is stored once)."""
+        chains: List[List[Dict[str, Any]]] = []
+        checkpoints = {}
+        for index, (chain, values) in sorted(self.checkpoints.items()):
+            if chain not in chains:
+                chains.append(chain)
+            checkpoints[str(index)] = [chains.index(chain), values]
+        with open(path, 'w') as f:
+            json.dump({'frame_rate': self.frame_rate, 'chains': chains, 'checkpoints': checkpoints}, f)
+
+    @classmethod
+    def load(cls, path: str) -> Optional['RenderState']:
+        """Read a state written by save(); returns None if it is missing or unreadable."""
+        if not os.path.exists(path):
+            return None
+        try:
+            with open(path) as f:
+                data = json.load(f)
+            chains = data['chains']
+            checkpoints = {int(index): (chains[chain_index], values)
+                           for index, (chain_index, values) in data['checkpoints'].items()}
+            return cls(data['frame_rate'], checkpoints)
+        except (OSError, ValueError, KeyError, IndexError, TypeError) as e:
+            print(f"Error reading render state: {str(e)}")
+            return None
+
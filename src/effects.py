@@ -0,0 +1,83 @@
+import math
+from typing import Any, Dict, List
+
+
+# Supported effects and their default parameters. New effects (e.g. EQ) are
+# added here and handled in AudioProcessor._render_effect().
+EFFECT_PARAMETERS = {
+    'compressor': {'threshold': -20.0, 'ratio': 4.0, 'attack': 5.0, 'release': 50.0},
+    'limiter': {'threshold': -1.0, 'release': 50.0},
+    'gain': {'gain_db': 0.0},
+    'normalize': {'headroom': 0.1},
+}
+
+# Output filename suffix for each effect
+EFFECT_SUFFIXES = {
+    'compressor': 'compressed',
+    'limiter': 'limited',
+    'gain': 'gain',
+    'normalize': 'normalized',
+}
+
+# Effects whose result depends on the whole input (e.g. its peak level), so a
+# region cannot be re-rendered in isolation; the limiter ends with a
+# normalize step, so its gain depends on the peak of what is rendered
+GLOBAL_EFFECTS = {'normalize', 'limiter'}
+
+# Envelope time constants an incremental edit is crossfaded over where it
+# meets a part of the render made with another chain
+SETTLING_TIME_CONSTANTS = 5
+
+MAX_CHAIN_LENGTH = 16
+
+
+def build_effect_chain(chain: Any) -> List[Dict[str, Any]]:
+    """
+    Validate an effect chain and fill in default parameters.
+    
+    Args:
+        chain: List of effect specs, each a dict with an 'effect' key and optional parameters
+    
+    Returns:
+        List of normalized specs with every parameter set as a float
+    
+    Raises:
+        ValueError: If the chain or one of its specs is invalid
+    """
+    if not isinstance(chain, list) or len(chain) == 0:
+        raise ValueError('chain must be a non-empty list of effects')
+    if len(chain) > MAX_CHAIN_LENGTH:
+        raise ValueError(f'chain must contain at most {MAX_CHAIN_LENGTH} effects')
+    
+    normalized_chain = []
+    for spec in chain:
+        if not isinstance(spec, dict) or spec.get('effect') not in EFFECT_PARAMETERS:
+            raise ValueError(f"Each effect must be one of: {', '.join(EFFECT_PARAMETERS)}")
+        effect = spec['effect']
+        normalized = {'effect': effect}
+        for name, default in EFFECT_PARAMETERS[effect].items():
+            value = spec.get(name, default)
+            try:
+                normalized[name] = float(value)
+            except (ValueError, TypeError):
+                raise ValueError(f'{effect} parameter {name} must be a number')
+            if not math.isfinite(normalized[name]):
+                raise ValueError(f'{effect} parameter {name} must be a number')
+        normalized_chain.append(normalized)
+    return normalized_chain
+
+
+def effect_chain_suffix(chain: List[Dict[str, Any]]) -> str:
+    """Build an output filename suffix from a chain, e.g. 'compressed_limited'."""
+    return '_'.join(EFFECT_SUFFIXES[spec['effect']] for spec in chain)
+
+
+def effect_chain_settling_ms(chain: List[Dict[str, Any]]) -> int:
+    """Time in ms a render with this chain is crossfaded over into one made with another chain."""
+    settle_ms = 0.0
+    for spec in chain:
+        if spec['effect'] == 'compressor':
+            settle_ms = max(settle_ms, SETTLING_TIME_CONSTANTS * max(spec['attack'], spec['release']))
+        elif spec['effect'] == 'limiter':
+            settle_ms = max(settle_ms, SETTLING_TIME_CONSTANTS * spec['release'])
+    return int(math.ceil(settle_ms))
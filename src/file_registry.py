@@ -0,0 +1,494 @@
+import os
+import sqlite3
+import threading
+import time
+import uuid
+import hashlib
+import json
+from typing import Optional, Dict, Any, List, Callable
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    file_id TEXT PRIMARY KEY,
+    filepath TEXT NOT NULL,
+    filename TEXT NOT NULL,
+    content_hash TEXT,
+    kind TEXT NOT NULL DEFAULT 'upload',
+    owner_id TEXT,
+    size_bytes INTEGER NOT NULL DEFAULT 0,
+    created_at REAL NOT NULL,
+    last_accessed REAL NOT NULL,
+    expires_at REAL
+);
+CREATE INDEX IF NOT EXISTS idx_files_content_hash ON files(content_hash);
+CREATE INDEX IF NOT EXISTS idx_files_filepath ON files(filepath);
+CREATE INDEX IF NOT EXISTS idx_files_expires_at ON files(expires_at);
+CREATE INDEX IF NOT EXISTS idx_files_last_accessed ON files(last_accessed);
+"""
+
+# Columns added after the first schema, as (name, definition)
+_MIGRATIONS = [
+    ('owner_id', 'TEXT'),
+]
+
+
+def compute_file_hash(filepath: str, block_size: int = 1024 * 1024) -> str:
+    """
+    Compute the SHA-256 hex digest of a file, reading it in blocks.
+
+    Args:
+        filepath: Path to the file to hash
+        block_size: Number of bytes read per iteration (default: 1 MiB)
+
+    Returns:
+        Hex digest string
+    """
+    digest = hashlib.sha256()
+    with open(filepath, 'rb') as f:
+        for block in iter(lambda: f.read(block_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def render_key(input_hash: str, operation: str, params: Dict[str, Any]) -> str:
+    """
+    Compute the content key of a rendered output.
+
+    The key is derived from the input's content hash, the operation name and
+    its parameters, so identical renders map to the same key.
+
+    Args:
+        input_hash: Content hash of the input file
+        operation: Operation name (e.g. 'compressor')
+        params: Operation parameters (must be JSON-serializable)
+
+    Returns:
+        Hex digest string
+    """
+    payload = json.dumps({'input': input_hash, 'operation': operation, 'params': params},
+                         sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class ContentStore:
+    """
+    Content-addressed storage for uploads and rendered outputs.
+
+    Files are stored as ``<root>/<content key>.<ext>``, so identical content is
+    stored once and concurrent requests never overwrite each other's files.
+    """
+
+    def __init__(self, root: str):
+        """Create the store, making the root directory if needed."""
+        self.root = root
+        os.makedirs(root, exist_ok=True)
+
+    def path_for(self, key: str, extension: str) -> str:
+        """Return the storage path for a content key and file extension."""
+        return os.path.join(self.root, f"{key}.{extension.lstrip('.').lower()}")
+
+    def temp_path(self, extension: str) -> str:
+        """Return a unique temporary path inside the store (same filesystem as the final path)."""
+        return os.path.join(self.root, f".tmp-{uuid.uuid4().hex}.{extension.lstrip('.').lower()}")
+
+    def add_file(self, temp_path: str, extension: str, key: Optional[str] = None) -> str:
+        """
+        Move a file into the store under its content key.
+
+        If a file with the same key is already stored, the temporary file is
+        discarded and the existing copy is shared.
+
+        Args:
+            temp_path: Path of the file to add (moved or deleted by this call)
+            extension: File extension of the stored file
+            key: Content key to store under (defaults to the SHA-256 of the file)
+
+        Returns:
+            Path of the stored file
+        """
+        key = key or compute_file_hash(temp_path)
+        final_path = self.path_for(key, extension)
+        if os.path.exists(final_path):
+            os.remove(temp_path)
+        else:
+            # Atomic on the same filesystem, so a concurrent identical add is harmless
+            os.replace(temp_path, final_path)
+        return final_path
+
+    @staticmethod
+    def remove_temp(*paths: Optional[str]):
+        """Delete temporary files left behind by a failed operation (missing files are ignored)."""
+        for path in paths:
+            if path is None:
+                continue
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                print(f"Error removing temporary file: {str(e)}")
+
+    def purge_stale_temp(self, max_age_seconds: float) -> int:
+        """
+        Delete temporary files that have not been modified for a while.
+
+        Catches files orphaned by abandoned uploads, crashed requests or a
+        server restart. Files still being written keep a recent mtime.
+
+        Args:
+            max_age_seconds: Minimum seconds since the last modification
+
+        Returns:
+            Number of files removed
+        """
+        cutoff = time.time() - max_age_seconds
+        removed = 0
+        with os.scandir(self.root) as entries:
+            for entry in entries:
+                if not entry.name.startswith('.tmp-') or not entry.is_file():
+                    continue
+                try:
+                    if entry.stat().st_mtime < cutoff:
+                        os.remove(entry.path)
+                        removed += 1
+                except FileNotFoundError:
+                    pass
+                except OSError as e:
+                    print(f"Error removing temporary file: {str(e)}")
+        return removed
+
+    def purge_orphaned(self, extension: str, owner_extension: str) -> int:
+        """
+        Delete stored files whose companion file under the same key is gone.
+
+        Args:
+            extension: Extension of the companion files (e.g. 'json')
+            owner_extension: Extension of the files they belong to (e.g. 'wav')
+
+        Returns:
+            Number of files removed
+        """
+        suffix = f".{extension.lstrip('.').lower()}"
+        removed = 0
+        with os.scandir(self.root) as entries:
+            for entry in entries:
+                if entry.name.startswith('.tmp-') or not entry.name.endswith(suffix):
+                    continue
+                key = entry.name[:-len(suffix)]
+                if os.path.exists(self.path_for(key, owner_extension)):
+                    continue
+                try:
+                    os.remove(entry.path)
+                    removed += 1
+                except FileNotFoundError:
+                    pass
+                except OSError as e:
+                    print(f"Error removing stored file: {str(e)}")
+        return removed
+
+
+class FileRegistry:
+    """
+    SQLite-backed registry mapping file IDs to stored audio files.
+
+    Replaces the in-memory ``file_storage`` dict. Entries expire after a TTL
+    (refreshed on access), a background janitor deletes expired files from
+    disk, and an optional disk quota evicts the least recently used files.
+    Several entries may point at the same file on disk; the file itself is
+    only deleted once no entry references it anymore.
+    """
+
+    def __init__(self, db_path: str, ttl_seconds: Optional[float] = 24 * 3600,
+                 max_bytes: Optional[int] = None, janitor_interval: float = 300.0):
+        """
+        Open (or create) the registry database.
+
+        Args:
+            db_path: Path to the SQLite database file (':memory:' is allowed)
+            ttl_seconds: Seconds an entry lives after its last access (None disables expiry)
+            max_bytes: Disk quota for all registered files in bytes (None disables the quota)
+            janitor_interval: Seconds between background cleanup runs
+        """
+        self.db_path = db_path
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self.janitor_interval = janitor_interval
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        with self._lock:
+            self._conn.executescript(_SCHEMA)
+            columns = {row['name'] for row in self._conn.execute("PRAGMA table_info(files)")}
+            for name, definition in _MIGRATIONS:
+                if name not in columns:
+                    self._conn.execute(f"ALTER TABLE files ADD COLUMN {name} {definition}")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_files_owner_id ON files(owner_id)")
+            self._conn.commit()
+        self._janitor_thread: Optional[threading.Thread] = None
+        self._janitor_stop = threading.Event()
+        self._janitor_tasks: List[Callable[[], Any]] = []
+        self._reservations: List[Callable[[], int]] = []
+
+    def _expiry(self, now: float) -> Optional[float]:
+        return now + self.ttl_seconds if self.ttl_seconds is not None else None
+
+    @staticmethod
+    def _row_to_dict(row: sqlite3.Row) -> Dict[str, Any]:
+        return {key: row[key] for key in row.keys()}
+
+    def register(self, filepath: str, filename: str, content_hash: Optional[str] = None,
+                 kind: str = 'upload', file_id: Optional[str] = None, owner_id: Optional[str] = None) -> str:
+        """
+        Register a file and return its file ID.
+
+        Args:
+            filepath: Path of the stored file
+            filename: User-facing filename (used for downloads)
+            content_hash: Optional content hash used for lookups
+            kind: Entry kind, e.g. 'upload' or 'output'
+            file_id: Optional explicit ID (a UUID4 is generated otherwise)
+            owner_id: Optional ID of the entry this one belongs to (removed along with it)
+
+        Returns:
+            The file ID of the new entry
+        """
+        file_id = file_id or str(uuid.uuid4())
+        size_bytes = os.path.getsize(filepath) if os.path.exists(filepath) else 0
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO files "
+                "(file_id, filepath, filename, content_hash, kind, owner_id, size_bytes, created_at, last_accessed, expires_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (file_id, filepath, filename, content_hash, kind, owner_id, size_bytes, now, now, self._expiry(now))
+            )
+            self._conn.commit()
+        if self.max_bytes is not None:
+            self.enforce_quota(protect=[file_id])
+        return file_id
+
+    def get(self, file_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Look up an entry by file ID and refresh its access time.
+
+        Returns:
+            Dict with the entry's columns, or None if missing or expired
+        """
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM files WHERE file_id = ?", (file_id,)).fetchone()
+            if row is None:
+                return None
+            if row['expires_at'] is not None and row['expires_at'] <= now:
+                self._delete_entries([row['file_id']])
+                return None
+            self._conn.execute(
+                "UPDATE files SET last_accessed = ?, expires_at = ? WHERE file_id = ?",
+                (now, self._expiry(now), file_id)
+            )
+            self._conn.commit()
+        return self._row_to_dict(row)
+
+    def __contains__(self, file_id: object) -> bool:
+        return isinstance(file_id, str) and self.get(file_id) is not None
+
+    def __getitem__(self, file_id: str) -> Dict[str, Any]:
+        entry = self.get(file_id)
+        if entry is None:
+            raise KeyError(file_id)
+        return entry
+
+    def find_by_hash(self, content_hash: str, kind: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """
+        Find the most recently used live entry with the given content hash.
+
+        Args:
+            content_hash: Content hash to look up
+            kind: Optional entry kind to restrict the lookup to
+
+        Returns:
+            Dict with the entry's columns, or None if nothing matches
+        """
+        now = time.time()
+        query = "SELECT * FROM files WHERE content_hash = ? AND (expires_at IS NULL OR expires_at > ?)"
+        params: List[Any] = [content_hash, now]
+        if kind is not None:
+            query += " AND kind = ?"
+            params.append(kind)
+        query += " ORDER BY last_accessed DESC LIMIT 1"
+        with self._lock:
+            row = self._conn.execute(query, params).fetchone()
+        if row is None:
+            return None
+        return self.get(row['file_id'])
+
+    def register_owned(self, owner_id: str, filepath: str, filename: str, kind: str) -> str:
+        """
+        Register the single entry of a kind that belongs to another entry.
+
+        The entry ID is '<kind>-<owner_id>', so registering again replaces
+        the previous entry, whose file is deleted unless still in use.
+
+        Args:
+            owner_id: File ID of the owning entry
+            filepath: Path of the stored file
+            filename: User-facing filename
+            kind: Entry kind, e.g. 'render'
+
+        Returns:
+            The file ID of the entry
+        """
+        file_id = f"{kind}-{owner_id}"
+        with self._lock:
+            previous = self._conn.execute("SELECT filepath FROM files WHERE file_id = ?", (file_id,)).fetchone()
+            self.register(filepath, filename, kind=kind, file_id=file_id, owner_id=owner_id)
+            if previous is not None and previous['filepath'] != filepath:
+                self.discard_if_unreferenced(previous['filepath'])
+        return file_id
+
+    def get_owned(self, owner_id: str, kind: str) -> Optional[Dict[str, Any]]:
+        """Look up the entry registered with register_owned() (None if missing or expired)."""
+        return self.get(f"{kind}-{owner_id}")
+
+    def remove(self, file_id: str) -> bool:
+        """Remove an entry, deleting its file if no other entry uses it."""
+        with self._lock:
+            return self._delete_entries([file_id]) > 0
+
+    def _delete_entries(self, file_ids: List[str]) -> int:
+        """Delete entries and any files on disk left without a reference."""
+        if not file_ids:
+            return 0
+        with self._lock:
+            # Entries owned by the deleted ones go with them
+            placeholders = ','.join('?' * len(file_ids))
+            file_ids = file_ids + [r['file_id'] for r in self._conn.execute(
+                f"SELECT file_id FROM files WHERE owner_id IN ({placeholders})", file_ids
+            ) if r['file_id'] not in file_ids]
+            placeholders = ','.join('?' * len(file_ids))
+            paths = [r['filepath'] for r in self._conn.execute(
+                f"SELECT DISTINCT filepath FROM files WHERE file_id IN ({placeholders})", file_ids
+            )]
+            cursor = self._conn.execute(f"DELETE FROM files WHERE file_id IN ({placeholders})", file_ids)
+            self._conn.commit()
+            for path in paths:
+                self.discard_if_unreferenced(path)
+            return cursor.rowcount
+
+    def discard_if_unreferenced(self, filepath: str) -> bool:
+        """Delete a file from disk unless a registry entry still points at it."""
+        with self._lock:
+            still_used = self._conn.execute(
+                "SELECT 1 FROM files WHERE filepath = ? LIMIT 1", (filepath,)
+            ).fetchone()
+            if still_used is not None:
+                return False
+            try:
+                os.remove(filepath)
+            except FileNotFoundError:
+                return False
+            except OSError as e:
+                print(f"Error removing stored file: {str(e)}")
+                return False
+            return True
+
+    def purge_expired(self) -> int:
+        """Delete all expired entries and their files. Returns the number of entries removed."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT file_id FROM files WHERE expires_at IS NOT NULL AND expires_at <= ?", (time.time(),)
+            ).fetchall()
+            return self._delete_entries([r['file_id'] for r in rows])
+
+    def total_bytes(self) -> int:
+        """Total size in bytes of the distinct files referenced by the registry."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT COALESCE(SUM(size_bytes), 0) AS total FROM "
+                "(SELECT MAX(size_bytes) AS size_bytes FROM files GROUP BY filepath)"
+            ).fetchone()
+        return int(row['total'])
+
+    def add_reservation(self, reserved_bytes: Callable[[], int]):
+        """Count disk space held outside the registry (e.g. unfinished uploads) against the quota."""
+        self._reservations.append(reserved_bytes)
+
+    def reserved_bytes(self) -> int:
+        """Total bytes reported by the callables passed to add_reservation()."""
+        return sum(reserved() for reserved in self._reservations)
+
+    def enforce_quota(self, protect: Optional[List[str]] = None) -> int:
+        """
+        Evict least recently used files until the disk quota is respected.
+
+        Reserved space (see add_reservation()) counts against the quota too.
+
+        Args:
+            protect: File IDs that must not be evicted (e.g. the entry just registered)
+
+        Returns:
+            Number of entries removed
+        """
+        if self.max_bytes is None:
+            return 0
+        protect_set = set(protect or [])
+        removed = 0
+        with self._lock:
+            total = self.total_bytes() + self.reserved_bytes()
+            if total <= self.max_bytes:
+                return 0
+            # Group entries by file so a shared file is evicted as a whole,
+            # ordered by the most recent access of any entry using it
+            files = self._conn.execute(
+                "SELECT filepath, MAX(size_bytes) AS size_bytes, MAX(last_accessed) AS last_used, "
+                "GROUP_CONCAT(file_id) AS file_ids FROM files GROUP BY filepath ORDER BY last_used ASC"
+            ).fetchall()
+            for f in files:
+                if total <= self.max_bytes:
+                    break
+                file_ids = f['file_ids'].split(',')
+                if protect_set.intersection(file_ids):
+                    continue
+                removed += self._delete_entries(file_ids)
+                total -= f['size_bytes']
+        return removed
+
+    def cleanup(self) -> int:
+        """Run one janitor pass: purge expired entries, then enforce the quota."""
+        return self.purge_expired() + self.enforce_quota()
+
+    def add_janitor_task(self, task: Callable[[], Any]):
+        """Run an extra cleanup callable (e.g. a temp-file sweep) on every janitor pass."""
+        self._janitor_tasks.append(task)
+
+    def _janitor_loop(self):
+        while not self._janitor_stop.wait(self.janitor_interval):
+            for task in [self.cleanup] + self._janitor_tasks:
+                try:
+                    task()
+                except Exception as e:
+                    print(f"Error in file registry janitor: {str(e)}")
+
+    def start_janitor(self):
+        """Start the background cleanup thread (idempotent)."""
+        if self._janitor_thread is not None and self._janitor_thread.is_alive():
+            return
+        self._janitor_stop.clear()
+        self._janitor_thread = threading.Thread(
+            target=self._janitor_loop, name='file-registry-janitor', daemon=True
+        )
+        self._janitor_thread.start()
+
+    def stop_janitor(self):
+        """Stop the background cleanup thread."""
+        self._janitor_stop.set()
+        if self._janitor_thread is not None:
+            self._janitor_thread.join(timeout=5)
+            self._janitor_thread = None
+
+    def close(self):
+        """Stop the janitor and close the database connection."""
+        self.stop_janitor()
+        with self._lock:
+            self._conn.close()
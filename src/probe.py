@@ -0,0 +1,411 @@
+import mmap
+import os
+from typing import Optional, Dict, Any, Callable
+
+# Only standard-library imports here: probing reads frame headers directly,
+# so it needs neither FFmpeg nor the audio stack (pydub, NumPy).
+
+# How far past any ID3v2 tag to look for the first frame
+_SYNC_SEARCH_BYTES = 64 * 1024
+
+# MPEG audio version bits -> version (None = reserved)
+_MPEG_VERSIONS = {0: '2.5', 1: None, 2: '2', 3: '1'}
+
+# MPEG layer bits -> layer (0 = reserved)
+_MPEG_LAYERS = {0: 0, 1: 3, 2: 2, 3: 1}
+
+_MPEG_SAMPLE_RATES = {
+    '1': (44100, 48000, 32000),
+    '2': (22050, 24000, 16000),
+    '2.5': (11025, 12000, 8000),
+}
+
+# Bitrates in kbps by bitrate index (index 0 = free format, 15 = invalid)
+_MPEG1_BITRATES = {
+    1: (0, 32, 64, 96, 128, 160, 192, 224, 256, 288, 320, 352, 384, 416, 448),
+    2: (0, 32, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320, 384),
+    3: (0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320),
+}
+_MPEG2_BITRATES = {
+    1: (0, 32, 48, 56, 64, 80, 96, 112, 128, 144, 160, 176, 192, 224, 256),
+    2: (0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160),
+    3: (0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160),
+}
+
+_ADTS_SAMPLE_RATES = (96000, 88200, 64000, 48000, 44100, 32000, 24000,
+                      22050, 16000, 12000, 11025, 8000, 7350)
+
+# ADTS channel configuration -> channel count (0 = defined in the stream, unknown here)
+_ADTS_CHANNELS = (None, 1, 2, 3, 4, 5, 6, 8)
+
+# Samples per AAC raw data block
+_AAC_FRAME_SAMPLES = 1024
+
+_AC3_SAMPLE_RATES = (48000, 44100, 32000)
+
+# Bitrates in kbps by AC-3 frame size code // 2
+_AC3_BITRATES = (32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320, 384, 448, 512, 576, 640)
+
+# Full-bandwidth channels by AC-3 audio coding mode (acmod)
+_AC3_CHANNELS = (2, 1, 2, 3, 3, 4, 4, 5)
+_AC3_CHANNEL_LAYOUTS = ('1+1', '1/0', '2/0', '3/0', '2/1', '3/1', '2/2', '3/2')
+
+# Samples per AC-3 sync frame (6 blocks of 256)
+_AC3_FRAME_SAMPLES = 1536
+
+
+class _BitReader:
+    """Read big-endian bit fields from a byte string."""
+
+    def __init__(self, data: bytes):
+        self.data = data
+        self.position = 0
+
+    def read(self, bits: int) -> int:
+        value = 0
+        for _ in range(bits):
+            byte = self.data[self.position >> 3]
+            value = (value << 1) | ((byte >> (7 - (self.position & 7))) & 1)
+            self.position += 1
+        return value
+
+
+def _id3v2_size(data) -> int:
+    """Return the size of a leading ID3v2 tag (0 if there is none)."""
+    if len(data) < 10 or data[:3] != b'ID3':
+        return 0
+    # Tag size is a 28-bit "syncsafe" integer (7 bits per byte)
+    size = (data[6] << 21) | (data[7] << 14) | (data[8] << 7) | data[9]
+    footer = 10 if data[5] & 0x10 else 0
+    return 10 + size + footer
+
+
+def _audio_end(data) -> int:
+    """Return the end of the audio data, excluding a trailing ID3v1 tag."""
+    end = len(data)
+    if end >= 128 and data[end - 128:end - 125] == b'TAG':
+        end -= 128
+    return end
+
+
+def _parse_mpeg_header(data, offset: int) -> Optional[Dict[str, Any]]:
+    """Parse an MPEG audio frame header at offset, or return None if there is none."""
+    if offset + 4 > len(data) or data[offset] != 0xFF or (data[offset + 1] & 0xE0) != 0xE0:
+        return None
+    version = _MPEG_VERSIONS[(data[offset + 1] >> 3) & 0x03]
+    layer = _MPEG_LAYERS[(data[offset + 1] >> 1) & 0x03]
+    bitrate_index = data[offset + 2] >> 4
+    sample_rate_index = (data[offset + 2] >> 2) & 0x03
+    if version is None or layer == 0 or bitrate_index in (0, 15) or sample_rate_index == 3:
+        return None
+
+    bitrates = _MPEG1_BITRATES if version == '1' else _MPEG2_BITRATES
+    bitrate = bitrates[layer][bitrate_index] * 1000
+    sample_rate = _MPEG_SAMPLE_RATES[version][sample_rate_index]
+    padding = (data[offset + 2] >> 1) & 0x01
+    if layer == 1:
+        samples = 384
+        length = (12 * bitrate // sample_rate + padding) * 4
+    elif layer == 3 and version != '1':
+        samples = 576
+        length = 72 * bitrate // sample_rate + padding
+    else:
+        samples = 1152
+        length = 144 * bitrate // sample_rate + padding
+    return {
+        'version': version,
+        'layer': layer,
+        'bitrate': bitrate,
+        'sample_rate': sample_rate,
+        'channels': 1 if (data[offset + 3] >> 6) == 3 else 2,
+        'samples': samples,
+        'length': length,
+    }
+
+
+def _read_vbr_header(data, offset: int, header: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """
+    Read a Xing/Info or VBRI header from the first MPEG frame.
+
+    Returns:
+        Dict with 'source', 'frames' and, if present, 'delay' and 'padding'
+        (encoder delay and padding in samples from a LAME tag), or None
+    """
+    # Xing/Info follows the side information, whose size depends on version and channels
+    if header['version'] == '1':
+        side_info = 17 if header['channels'] == 1 else 32
+    else:
+        side_info = 9 if header['channels'] == 1 else 17
+    xing = offset + 4 + side_info
+    if data[xing:xing + 4] in (b'Xing', b'Info') and xing + 8 <= len(data):
+        flags = int.from_bytes(data[xing + 4:xing + 8], 'big')
+        position = xing + 8
+        frames = None
+        if flags & 0x01:
+            frames = int.from_bytes(data[position:position + 4], 'big')
+            position += 4
+        if frames is None:
+            return None
+        if flags & 0x02:
+            position += 4
+        if flags & 0x04:
+            position += 100
+        if flags & 0x08:
+            position += 4
+        result: Dict[str, Any] = {'source': 'xing', 'frames': frames}
+        # LAME tag (also written by FFmpeg, as Lavf/Lavc): encoder delay and
+        # padding (12 bits each) 21 bytes in
+        lame = data[position + 21:position + 24]
+        if data[position:position + 4] in (b'LAME', b'Lavf', b'Lavc') and len(lame) == 3:
+            result['delay'] = (lame[0] << 4) | (lame[1] >> 4)
+            result['padding'] = ((lame[1] & 0x0F) << 8) | lame[2]
+        return result
+
+    # VBRI (Fraunhofer) is always 32 bytes after the frame header
+    vbri = offset + 36
+    if data[vbri:vbri + 4] == b'VBRI' and vbri + 18 <= len(data):
+        return {'source': 'vbri', 'frames': int.from_bytes(data[vbri + 14:vbri + 18], 'big')}
+    return None
+
+
+def _probe_mp3(data, start: int) -> Optional[Dict[str, Any]]:
+    header = _parse_mpeg_header(data, start)
+    if header is None:
+        return None
+    end = _audio_end(data)
+    vbr = _read_vbr_header(data, start, header)
+    if vbr is not None:
+        samples = vbr['frames'] * header['samples'] - vbr.get('delay', 0) - vbr.get('padding', 0)
+        frames = vbr['frames']
+        source = vbr['source']
+    else:
+        # No VBR table: walk the frame headers (no decoding) and count samples
+        frames = samples = 0
+        offset = start
+        while True:
+            frame = _parse_mpeg_header(data, offset)
+            if frame is None or offset + frame['length'] > end:
+                break
+            frames += 1
+            samples += frame['samples']
+            offset += frame['length']
+        source = 'frames'
+    return {
+        'format': 'mp3' if header['layer'] == 3 else f"mp{header['layer']}",
+        'codec': f"MPEG-{header['version']} Layer {'I' * header['layer']}",
+        'sample_rate': header['sample_rate'],
+        'channels': header['channels'],
+        'frames': frames,
+        'samples': max(0, samples),
+        'duration_source': source,
+        'audio_bytes': end - start,
+    }
+
+
+def _parse_adts_header(data, offset: int) -> Optional[Dict[str, Any]]:
+    """Parse an ADTS (AAC) frame header at offset, or return None if there is none."""
+    if offset + 7 > len(data) or data[offset] != 0xFF or (data[offset + 1] & 0xF6) != 0xF0:
+        return None
+    sample_rate_index = (data[offset + 2] >> 2) & 0x0F
+    if sample_rate_index >= len(_ADTS_SAMPLE_RATES):
+        return None
+    length = ((data[offset + 3] & 0x03) << 11) | (data[offset + 4] << 3) | (data[offset + 5] >> 5)
+    if length < 7:
+        return None
+    return {
+        'profile': (data[offset + 2] >> 6) + 1,
+        'sample_rate': _ADTS_SAMPLE_RATES[sample_rate_index],
+        'channels': _ADTS_CHANNELS[((data[offset + 2] & 0x01) << 2) | (data[offset + 3] >> 6)],
+        'blocks': (data[offset + 6] & 0x03) + 1,
+        'length': length,
+    }
+
+
+def _probe_aac(data, start: int) -> Optional[Dict[str, Any]]:
+    header = _parse_adts_header(data, start)
+    if header is None:
+        return None
+    end = _audio_end(data)
+    frames = blocks = 0
+    offset = start
+    while True:
+        frame = _parse_adts_header(data, offset)
+        if frame is None or offset + frame['length'] > end:
+            break
+        frames += 1
+        blocks += frame['blocks']
+        offset += frame['length']
+    profiles = {1: 'AAC Main', 2: 'AAC LC', 3: 'AAC SSR', 4: 'AAC LTP'}
+    return {
+        'format': 'aac',
+        'codec': profiles[header['profile']] + ' (ADTS)',
+        'sample_rate': header['sample_rate'],
+        'channels': header['channels'],
+        'frames': frames,
+        'samples': blocks * _AAC_FRAME_SAMPLES,
+        'duration_source': 'frames',
+        'audio_bytes': end - start,
+    }
+
+
+def _parse_ac3_header(data, offset: int) -> Optional[Dict[str, Any]]:
+    """Parse an AC-3 or E-AC-3 sync frame header at offset, or return None if there is none."""
+    if offset + 8 > len(data) or data[offset] != 0x0B or data[offset + 1] != 0x77:
+        return None
+    bsid = data[offset + 5] >> 3
+    if bsid <= 8:
+        # AC-3: fscod, frmsizecod, bsid, bsmod, acmod, (mix levels), lfeon
+        fscod = data[offset + 4] >> 6
+        frame_size_code = data[offset + 4] & 0x3F
+        if fscod == 3 or frame_size_code >= 2 * len(_AC3_BITRATES):
+            return None
+        bitrate = _AC3_BITRATES[frame_size_code >> 1]
+        sample_rate = _AC3_SAMPLE_RATES[fscod]
+        # Frame size in 16-bit words: 1536 samples at the nominal bitrate
+        # (44.1 kHz frames alternate between two sizes via the low bit)
+        if sample_rate == 44100:
+            words = bitrate * 1000 * _AC3_FRAME_SAMPLES // sample_rate // 16 + (frame_size_code & 1)
+        else:
+            words = bitrate * 1000 * _AC3_FRAME_SAMPLES // sample_rate // 16
+        reader = _BitReader(data[offset + 6:offset + 8])
+        acmod = reader.read(3)
+        if acmod & 0x01 and acmod != 1:
+            reader.read(2)  # cmixlev
+        if acmod & 0x04:
+            reader.read(2)  # surmixlev
+        if acmod == 2:
+            reader.read(2)  # dsurmod
+        return {
+            'format': 'ac3',
+            'independent': True,
+            'sample_rate': sample_rate,
+            'acmod': acmod,
+            'lfe': bool(reader.read(1)),
+            'samples': _AC3_FRAME_SAMPLES,
+            'length': words * 2,
+        }
+    if 11 <= bsid <= 16:
+        # E-AC-3: strmtyp, substreamid, frmsiz, fscod, (fscod2 | numblkscod), acmod, lfeon
+        reader = _BitReader(data[offset + 2:offset + 6])
+        stream_type = reader.read(2)
+        substream_id = reader.read(3)
+        words = reader.read(11) + 1
+        fscod = reader.read(2)
+        if fscod == 3:
+            fscod2 = reader.read(2)
+            if fscod2 == 3:
+                return None
+            sample_rate = _AC3_SAMPLE_RATES[fscod2] // 2
+            blocks = 6
+        else:
+            sample_rate = _AC3_SAMPLE_RATES[fscod]
+            blocks = (1, 2, 3, 6)[reader.read(2)]
+        acmod = reader.read(3)
+        return {
+            'format': 'eac3',
+            # Dependent substreams extend the channels of an independent one
+            'independent': stream_type != 1 and substream_id == 0,
+            'sample_rate': sample_rate,
+            'acmod': acmod,
+            'lfe': bool(reader.read(1)),
+            'samples': 256 * blocks,
+            'length': words * 2,
+        }
+    return None
+
+
+def _probe_ac3(data, start: int) -> Optional[Dict[str, Any]]:
+    header = _parse_ac3_header(data, start)
+    if header is None:
+        return None
+    end = len(data)
+    frames = samples = 0
+    offset = start
+    while True:
+        frame = _parse_ac3_header(data, offset)
+        if frame is None or offset + frame['length'] > end:
+            break
+        if frame['independent']:
+            frames += 1
+            samples += frame['samples']
+        offset += frame['length']
+    return {
+        'format': header['format'],
+        'codec': 'E-AC-3' if header['format'] == 'eac3' else 'AC-3',
+        'sample_rate': header['sample_rate'],
+        'channels': _AC3_CHANNELS[header['acmod']] + int(header['lfe']),
+        'channel_layout': _AC3_CHANNEL_LAYOUTS[header['acmod']] + ('+LFE' if header['lfe'] else ''),
+        'frames': frames,
+        'samples': samples,
+        'duration_source': 'frames',
+        'audio_bytes': end - start,
+    }
+
+
+# Probe functions tried for each file extension, most likely first
+_PROBES: Dict[str, Callable[[Any, int], Optional[Dict[str, Any]]]] = {
+    'mp3': _probe_mp3,
+    'aac': _probe_aac,
+    'ac3': _probe_ac3,
+}
+
+
+def _find_first_frame(data, start: int, probe: Callable[[Any, int], Optional[Dict[str, Any]]]) -> Optional[Dict[str, Any]]:
+    """Try a probe at every candidate sync position in the search window."""
+    end = min(len(data), start + _SYNC_SEARCH_BYTES)
+    sync_byte = 0x0B if probe is _probe_ac3 else 0xFF
+    offset = data.find(bytes([sync_byte]), start, end)
+    while offset != -1:
+        result = probe(data, offset)
+        # Require at least two frames so a stray sync pattern is not mistaken for audio
+        if result is not None and (result['frames'] >= 2 or result['duration_source'] != 'frames'):
+            return result
+        offset = data.find(bytes([sync_byte]), offset + 1, end)
+    return None
+
+
+def probe_audio_file(filepath: str, extension: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Read format metadata and the exact duration from frame headers, without decoding.
+
+    MP3 durations come from the Xing/Info (including LAME encoder delay and
+    padding) or VBRI table when present, otherwise from walking every frame
+    header. AAC (ADTS) and AC-3/E-AC-3 durations come from walking the frame
+    headers. Nothing is decoded, so this needs neither FFmpeg nor NumPy.
+
+    Args:
+        filepath: Path to the audio file
+        extension: File extension used to pick the parser to try first (default: from filepath)
+
+    Returns:
+        Dictionary with format, codec, sample_rate, channels, duration_ms,
+        bitrate_kbps (average), frames and duration_source
+
+    Raises:
+        ValueError: If no supported frame headers are found
+    """
+    if extension is None:
+        extension = os.path.splitext(filepath)[1].lstrip('.')
+    extension = extension.lower()
+    order = [extension] if extension in _PROBES else []
+    order += [name for name in _PROBES if name != extension]
+
+    with open(filepath, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            raise ValueError('empty file')
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            start = _id3v2_size(data)
+            result = None
+            for name in order:
+                result = _find_first_frame(data, start, _PROBES[name])
+                if result is not None:
+                    break
+    if result is None or not result['sample_rate']:
+        raise ValueError('no supported audio frames found')
+
+    samples = result.pop('samples')
+    audio_bytes = result.pop('audio_bytes')
+    duration_ms = int(round(samples * 1000 / result['sample_rate']))
+    result['duration_ms'] = duration_ms
+    result['bitrate_kbps'] = round(audio_bytes * 8 / duration_ms, 1) if duration_ms > 0 else None
+    return result
@@ -0,0 +1,146 @@
+import re
+import time
+import threading
+from typing import Optional, Dict, Any, List, Iterator, Callable
+
+# Client-chosen progress IDs: letters, digits and dashes (e.g. a UUID)
+_PROGRESS_ID_PATTERN = re.compile(r'^[A-Za-z0-9-]{8,64}$')
+
+
+def is_valid_progress_id(progress_id: Any) -> bool:
+    """Return True if a client-supplied progress ID is acceptable."""
+    return isinstance(progress_id, str) and _PROGRESS_ID_PATTERN.match(progress_id) is not None
+
+
+class _ProgressJob:
+    def __init__(self):
+        self.events: List[Dict[str, Any]] = []
+        self.finished = False
+        self.updated_at = time.time()
+        self.stage_started: Dict[str, float] = {}
+
+
+class ProgressTracker:
+    """
+    In-memory progress events for long-running analysis and rendering jobs.
+
+    Request handlers report progress under a client-chosen progress ID, and
+    the /progress/<progress_id> route streams the events to the browser as
+    server-sent events. Each event carries the stage, chunks done and total,
+    an ETA for the stage and optional partial statistics.
+    """
+
+    def __init__(self, ttl_seconds: float = 600.0):
+        """
+        Args:
+            ttl_seconds: Seconds a job's events are kept after its last update
+        """
+        self.ttl_seconds = ttl_seconds
+        self._jobs: Dict[str, _ProgressJob] = {}
+        self._condition = threading.Condition()
+
+    def _job(self, progress_id: str) -> _ProgressJob:
+        job = self._jobs.get(progress_id)
+        if job is None:
+            job = self._jobs[progress_id] = _ProgressJob()
+        return job
+
+    def update(self, progress_id: str, stage: str, done: int, total: int, **data):
+        """
+        Record a progress event.
+
+        Args:
+            progress_id: ID of the job
+            stage: Name of the current stage (e.g. 'peak', 'render')
+            done: Units of work finished in this stage
+            total: Total units of work in this stage
+            **data: Extra fields, e.g. statistics=<partial statistics dict>
+        """
+        now = time.time()
+        with self._condition:
+            job = self._job(progress_id)
+            started = job.stage_started.setdefault(stage, now)
+            eta = None
+            if 0 < done < total:
+                eta = round((now - started) * (total - done) / done, 2)
+            elif done >= total:
+                eta = 0.0
+            job.events.append(dict(data, event='progress', stage=stage, done=done, total=total, eta_seconds=eta))
+            job.updated_at = now
+            self._condition.notify_all()
+
+    def finish(self, progress_id: str, error: Optional[str] = None):
+        """
+        Mark a job as finished (optionally with a user-facing error message).
+
+        Finishing a job that already finished does nothing, so a request
+        handler may finish its job on every return path.
+        """
+        with self._condition:
+            job = self._job(progress_id)
+            if job.finished:
+                return
+            event: Dict[str, Any] = {'event': 'done'}
+            if error is not None:
+                event['error'] = error
+            job.events.append(event)
+            job.finished = True
+            job.updated_at = time.time()
+            self._condition.notify_all()
+        self.purge_expired()
+
+    def reporter(self, progress_id: Optional[str]) -> Optional[Callable[..., None]]:
+        """Return a progress callback bound to a job, or None if there is no job."""
+        if progress_id is None:
+            return None
+
+        def report(stage: str, done: int, total: int, **data):
+            self.update(progress_id, stage, done, total, **data)
+        return report
+
+    def events(self, progress_id: str, keepalive_seconds: float = 15.0,
+               max_wait_seconds: Optional[float] = None) -> Iterator[Optional[Dict[str, Any]]]:
+        """
+        Yield a job's events as they arrive, until it finishes.
+
+        Yields None when no event arrived within keepalive_seconds, so the
+        caller can send a keep-alive. Subscribing before the job starts is fine;
+        subscribers never create a job, only request handlers do.
+
+        Args:
+            progress_id: ID of the job
+            keepalive_seconds: Maximum time to block waiting for an event
+            max_wait_seconds: Stop after this long without any event (default: the tracker TTL)
+        """
+        self.purge_expired()
+        max_wait = self.ttl_seconds if max_wait_seconds is None else max_wait_seconds
+        index = 0
+        idle_since = time.time()
+        while True:
+            with self._condition:
+                job = self._jobs.get(progress_id)
+                if job is None or index >= len(job.events):
+                    self._condition.wait(timeout=keepalive_seconds)
+                    job = self._jobs.get(progress_id)
+                new_events = job.events[index:] if job is not None else []
+                index += len(new_events)
+                finished = job is not None and job.finished
+            if new_events:
+                idle_since = time.time()
+                for event in new_events:
+                    yield event
+            else:
+                if time.time() - idle_since >= max_wait:
+                    return
+                yield None
+            if finished:
+                return
+
+    def purge_expired(self) -> int:
+        """Forget jobs not updated within the TTL. Returns the number removed."""
+        cutoff = time.time() - self.ttl_seconds
+        with self._condition:
+            expired = [pid for pid, job in self._jobs.items() if job.updated_at < cutoff]
+            for pid in expired:
+                del self._jobs[pid]
+        return len(expired)
@@ -0,0 +1,48 @@
+import functools
+import shutil
+import threading
+from typing import Optional
+
+# Only standard-library imports here: this module is imported by the web
+# process at startup, before the heavy audio stack (pydub, NumPy) is loaded.
+
+
+@functools.lru_cache(maxsize=1)
+def ffmpeg_path() -> Optional[str]:
+    """Locate the FFmpeg (or avconv) binary once and cache the result."""
+    return shutil.which('ffmpeg') or shutil.which('avconv')
+
+
+def ffmpeg_available() -> bool:
+    """Return True if an FFmpeg binary is available for decoding/encoding."""
+    return ffmpeg_path() is not None
+
+
+def preload_audio_stack(warm_workers: bool = True):
+    """
+    Import the audio processing stack and optionally start the worker pool.
+
+    Meant to run off the request path (see start_background_preload()), so the
+    server can accept connections while pydub, NumPy and the worker
+    processes are being loaded.
+
+    Args:
+        warm_workers: Also start the analysis worker processes (default: True)
+    """
+    ffmpeg_path()
+    from . import audio_processor
+    if warm_workers:
+        audio_processor.warm_worker_pool()
+
+
+def start_background_preload(warm_workers: bool = True) -> threading.Thread:
+    """Run preload_audio_stack() in a daemon thread and return the thread."""
+    def _preload():
+        try:
+            preload_audio_stack(warm_workers)
+        except Exception as e:
+            print(f"Error preloading audio stack: {str(e)}")
+
+    thread = threading.Thread(target=_preload, name='audio-stack-preload', daemon=True)
+    thread.start()
+    return thread
@@ -0,0 +1,45 @@
+import os
+from typing import Optional
+
+#TODO: Refactor ThreadConfig to use singleton pattern
+
+class ThreadConfig:
+    """Configuration for multi-threading in audio processing operations."""
+    _instance = None
+    _num_threads = None
+    
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super(ThreadConfig, cls).__new__(cls)
+        return cls._instance
+    
+    @classmethod
+    def set_num_threads(cls, num_threads: Optional[int] = None):
+        """
+        Set the number of threads to use for audio processing.
+        
+        Args:
+            num_threads: Number of threads to use. If None, defaults to half of CPU cores.
+                        Maximum is the number of CPU cores.
+        """
+        cpu_count = os.cpu_count() or 2
+        if num_threads is None:
+            cls._num_threads = max(1, cpu_count // 2)
+        else:
+            cls._num_threads = max(1, min(num_threads, cpu_count))
+    
+    @classmethod
+    def get_num_threads(cls) -> int:
+        """Get the configured number of threads for audio processing."""
+        if cls._num_threads is None:
+            cls.set_num_threads()
+
+        # At this point _num_threads is guaranteed to be set to an int by set_num_threads()
+        # but the class attribute is typed as Optional[int], so help the type checker.
+        assert isinstance(cls._num_threads, int)
+        return cls._num_threads
+    
+    @classmethod
+    def get_max_threads(cls) -> int:
+        """Get the maximum number of threads (CPU cores)."""
+        return os.cpu_count() or 2
@@ -0,0 +1,18 @@
+"""
+Shared pytest configuration.
+
+Points the file registry and content store at a scratch directory before
+src.app is imported, so the route tests never touch the registry and stored
+audio of a real instance in the system temp directory.
+"""
+
+import atexit
+import os
+import shutil
+import tempfile
+
+_data_dir = tempfile.mkdtemp(prefix='audio_app_tests_')
+atexit.register(shutil.rmtree, _data_dir, ignore_errors=True)
+
+os.environ['REGISTRY_DB_PATH'] = os.path.join(_data_dir, 'audio_file_registry.sqlite3')
+os.environ['CONTENT_STORE_DIR'] = os.path.join(_data_dir, 'audio_store')
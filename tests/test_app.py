@@ -195,5 +195,916 @@ def test_set_thread_settings_invalid(client):
                           json={'num_threads': 0})
     assert response.status_code == 400
 
+def test_file_registry_register_and_lookup():
+    """Test registering files and looking them up by ID and content hash."""
+    from src.file_registry import FileRegistry, compute_file_hash
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = os.path.join(tmpdir, 'a.mp3')
+        with open(path, 'wb') as f:
+            f.write(b'abc' * 100)
+        registry = FileRegistry(os.path.join(tmpdir, 'registry.sqlite3'))
+        content_hash = compute_file_hash(path)
+        file_id = registry.register(path, 'a.mp3', content_hash=content_hash)
+
+        assert file_id in registry
+        assert 'missing-id' not in registry
+        assert registry[file_id]['filepath'] == path
+        assert registry[file_id]['size_bytes'] == 300
+        assert registry.find_by_hash(content_hash)['file_id'] == file_id
+        assert registry.find_by_hash('0' * 64) is None
+
+        # Removing the entry deletes the file from disk
+        assert registry.remove(file_id)
+        assert file_id not in registry
+        assert not os.path.exists(path)
+        registry.close()
+
+def test_file_registry_ttl_expiry():
+    """Test that expired entries are purged together with their files."""
+    from src.file_registry import FileRegistry
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = os.path.join(tmpdir, 'a.mp3')
+        with open(path, 'wb') as f:
+            f.write(b'x')
+        registry = FileRegistry(':memory:', ttl_seconds=0)
+        file_id = registry.register(path, 'a.mp3')
+
+        assert registry.purge_expired() == 1
+        assert registry.get(file_id) is None
+        assert not os.path.exists(path)
+        registry.close()
+
+def test_file_registry_quota_lru_eviction():
+    """Test that the disk quota evicts the least recently used file first."""
+    from src.file_registry import FileRegistry
+    import time
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        paths = []
+        for name in ('a', 'b', 'c'):
+            path = os.path.join(tmpdir, f'{name}.mp3')
+            with open(path, 'wb') as f:
+                f.write(b'x' * 100)
+            paths.append(path)
+        registry = FileRegistry(':memory:', max_bytes=250)
+        id_a = registry.register(paths[0], 'a.mp3')
+        time.sleep(0.01)
+        id_b = registry.register(paths[1], 'b.mp3')
+        time.sleep(0.01)
+        # Touch 'a' so that 'b' becomes the least recently used entry
+        registry.get(id_a)
+        time.sleep(0.01)
+        id_c = registry.register(paths[2], 'c.mp3')
+
+        assert id_a in registry
+        assert id_b not in registry
+        assert id_c in registry
+        assert not os.path.exists(paths[1])
+        assert registry.total_bytes() <= 250
+        registry.close()
+
+def test_content_store_deduplicates():
+    """Test that identical content is stored once under its content key."""
+    from src.file_registry import ContentStore, compute_file_hash
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        store = ContentStore(os.path.join(tmpdir, 'store'))
+        stored_paths = []
+        for _ in range(2):
+            temp_path = store.temp_path('mp3')
+            with open(temp_path, 'wb') as f:
+                f.write(b'same content')
+            stored_paths.append(store.add_file(temp_path, 'mp3'))
+            assert not os.path.exists(temp_path)
+
+        assert stored_paths[0] == stored_paths[1]
+        assert os.path.basename(stored_paths[0]) == compute_file_hash(stored_paths[0]) + '.mp3'
+        assert len(os.listdir(store.root)) == 1
+
+def test_content_store_purges_stale_temp_files():
+    """Test that the temp-file sweep only removes old temporary files."""
+    from src.file_registry import ContentStore
+    import time
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        store = ContentStore(os.path.join(tmpdir, 'store'))
+        stale, fresh = store.temp_path('mp3'), store.temp_path('mp3')
+        stored = store.path_for('stored-key', 'mp3')
+        for path in (stale, fresh, stored):
+            with open(path, 'wb') as f:
+                f.write(b'data')
+        old = time.time() - 3 * 3600
+        os.utime(stale, (old, old))
+        os.utime(stored, (old, old))
+
+        assert store.purge_stale_temp(2 * 3600) == 1
+        assert not os.path.exists(stale)
+        assert os.path.exists(fresh) and os.path.exists(stored)
+
+        store.remove_temp(fresh, stale, None)
+        assert os.listdir(store.root) == [os.path.basename(stored)]
+
+def test_process_failure_removes_temp_files(client, monkeypatch):
+    """Test that a failed render does not leave temporary files in the content store."""
+    from src import app as app_module
+    from src import audio_processor
+    from src.app import file_registry, content_store
+    from pydub import AudioSegment
+    from pydub.generators import Sine
+
+    upload_path = content_store.path_for('test-temp-cleanup-hash', 'mp3')
+    with open(upload_path, 'wb') as f:
+        f.write(b'not really audio')
+    upload_id = file_registry.register(upload_path, 'song.mp3', content_hash='test-temp-cleanup-hash')
+    audio = Sine(440, sample_rate=8000).to_audio_segment(duration=500).set_channels(1)
+
+    original_export = AudioSegment.export
+
+    def failing_mp3_export(self, out_f, format='mp3', **kwargs):
+        if format != 'mp3':
+            return original_export(self, out_f, format=format, **kwargs)
+        with open(out_f, 'wb') as f:
+            f.write(b'partial')
+        raise RuntimeError('encoder failed')
+
+    monkeypatch.setattr(app_module, 'ffmpeg_available', lambda: True)
+    processor = _processor_for_segment(audio)
+    monkeypatch.setattr(audio_processor, 'AudioProcessor', lambda filepath: processor)
+    monkeypatch.setattr(AudioSegment, 'export', failing_mp3_export)
+    before = {name for name in os.listdir(content_store.root) if name.startswith('.tmp-')}
+    try:
+        for mode in ('full', 'incremental'):
+            response = client.post('/process', json={'file_id': upload_id, 'mode': mode,
+                                                     'chain': [{'effect': 'gain', 'gain_db': -3}]})
+            assert response.status_code == 500
+            after = {name for name in os.listdir(content_store.root) if name.startswith('.tmp-')}
+            assert after == before
+    finally:
+        file_registry.remove(upload_id)
+
+def test_process_returns_cached_render(client):
+    """Test that an identical /process request reuses the stored output."""
+    from src.app import file_registry, content_store
+    from src.file_registry import render_key
+
+    upload_path = content_store.path_for('test-upload-hash', 'mp3')
+    with open(upload_path, 'wb') as f:
+        f.write(b'not really audio')
+    upload_id = file_registry.register(upload_path, 'song.mp3', content_hash='test-upload-hash')
+
+    chain = [{'effect': 'compressor', 'threshold': -20.0, 'ratio': 4.0, 'attack': 5.0, 'release': 50.0}]
+    output_key = render_key('test-upload-hash', 'chain',
+                            {'chain': chain, 'start_time': None, 'end_time': None})
+    output_path = content_store.path_for(output_key, 'mp3')
+    with open(output_path, 'wb') as f:
+        f.write(b'rendered')
+    output_id = file_registry.register(output_path, 'song_compressed.mp3',
+                                       content_hash=output_key, kind='output')
+    try:
+        # The upload is not decodable, so only a cache hit can succeed
+        response = client.post('/process', json={'file_id': upload_id, 'operation': 'compressor'})
+        assert response.status_code == 200
+        data = response.get_json()
+        assert data['file_id'] == output_id
+        assert data['filename'] == 'song_compressed.mp3'
+        assert data['cached'] == True
+
+        # The same render expressed as a one-element chain hits the same cache entry
+        response = client.post('/process', json={'file_id': upload_id, 'chain': [{'effect': 'compressor'}]})
+        assert response.status_code == 200
+        assert response.get_json()['file_id'] == output_id
+    finally:
+        file_registry.remove(upload_id)
+        file_registry.remove(output_id)
+
+def test_build_effect_chain():
+    """Test effect chain validation and default parameters."""
+    from src.audio_processor import build_effect_chain, effect_chain_suffix
+
+    chain = build_effect_chain([
+        {'effect': 'compressor', 'ratio': '6'},
+        {'effect': 'gain', 'gain_db': -3},
+        {'effect': 'limiter'}
+    ])
+    assert chain[0] == {'effect': 'compressor', 'threshold': -20.0, 'ratio': 6.0, 'attack': 5.0, 'release': 50.0}
+    assert chain[1] == {'effect': 'gain', 'gain_db': -3.0}
+    assert chain[2] == {'effect': 'limiter', 'threshold': -1.0, 'release': 50.0}
+    assert effect_chain_suffix(chain) == 'compressed_gain_limited'
+
+    for invalid in ([], 'compressor', [{'effect': 'reverb'}], [{'effect': 'gain', 'gain_db': 'loud'}]):
+        with pytest.raises(ValueError):
+            build_effect_chain(invalid)
+
+def test_process_invalid_chain(client):
+    """Test process endpoint with an invalid effect chain."""
+    from src.app import file_registry, content_store
+
+    upload_path = content_store.path_for('test-chain-hash', 'mp3')
+    with open(upload_path, 'wb') as f:
+        f.write(b'not really audio')
+    upload_id = file_registry.register(upload_path, 'song.mp3', content_hash='test-chain-hash')
+    try:
+        response = client.post('/process', json={'file_id': upload_id, 'chain': [{'effect': 'reverb'}]})
+        assert response.status_code == 400
+        response = client.post('/process', json={'file_id': upload_id, 'operation': 'reverb'})
+        assert response.status_code == 400
+    finally:
+        file_registry.remove(upload_id)
+
+def _processor_for_segment(audio):
+    """Build an AudioProcessor around an in-memory segment (no decoding needed)."""
+    from src.audio_processor import AudioProcessor
+
+    return AudioProcessor.from_segment(audio)
+
+def test_rerender_region_splices_into_base_render():
+    """Test that re-rendering a region only changes that region and its crossfade tail."""
+    from src.audio_processor import build_effect_chain, effect_chain_settling_ms
+    from pydub.generators import Sine
+
+    audio = Sine(440, sample_rate=8000).to_audio_segment(duration=3000, volume=-3).set_channels(1)
+    processor = _processor_for_segment(audio)
+    chain = build_effect_chain([{'effect': 'compressor', 'threshold': -20, 'ratio': 4, 'attack': 5, 'release': 50}])
+    base_render, base_state = processor._render_dynamics(chain, 0, len(audio))
+    assert base_render.raw_data == processor._render_chain(audio, chain).raw_data
+
+    # Same chain: resuming from the stored state reproduces the full render
+    spliced, state = processor.rerender_region(base_render, chain, 1.0, 1.5, base_state=base_state)
+    assert spliced.raw_data == base_render.raw_data
+    assert state.checkpoints == base_state.checkpoints
+
+    # Different chain: only the region and the crossfade tail change
+    edited_chain = chain + build_effect_chain([{'effect': 'gain', 'gain_db': -6}])
+    edited, edited_state = processor.rerender_region(base_render, edited_chain, 1.0, 1.5, base_state=base_state)
+    assert len(edited) == len(base_render)
+    tail_ms = effect_chain_settling_ms(chain)
+    assert edited[:1000].raw_data == base_render[:1000].raw_data
+    assert edited[1500 + tail_ms:].raw_data == base_render[1500 + tail_ms:].raw_data
+    assert edited[1000:1500].max < base_render[1000:1500].max
+    assert edited_state.get(1, edited_chain) is not None and edited_state.get(2, chain) is not None
+
+    # Effects that depend on the whole file cannot be re-rendered per region
+    with pytest.raises(ValueError):
+        processor.rerender_region(base_render, [{'effect': 'normalize'}], 1.0, 1.5)
+
+    # The limiter normalizes what it renders, so a quiet region re-rendered on
+    # its own would jump to full scale next to the rest of the base render
+    loud_start = Sine(440, sample_rate=8000).to_audio_segment(duration=1000, volume=-1).set_channels(1)
+    quiet_rest = Sine(440, sample_rate=8000).to_audio_segment(duration=2000, volume=-20).set_channels(1)
+    processor = _processor_for_segment(loud_start + quiet_rest)
+    limiter_chain = build_effect_chain([{'effect': 'limiter'}])
+    base_render = processor._render_chain(processor.audio, limiter_chain)
+    with pytest.raises(ValueError):
+        processor.rerender_region(base_render, limiter_chain, 2.0, 2.5)
+
+def test_min_dbfs_chunk_and_noise_floor():
+    """Test the raw-bytes min-sample scan and windowed-RMS noise-floor histogram."""
+    from src.audio_processor import (_process_chunk_for_min_dbfs, _histogram_percentile,
+                                     NOISE_FLOOR_HISTOGRAM_EDGES)
+    import numpy as np
+
+    frame_rate = 8000
+    rng = np.random.default_rng(0)
+    # 1 s of loud tone followed by 1 s of low-level noise (about -60 dBFS RMS)
+    tone = (0.5 * 32767 * np.sin(2 * np.pi * 440 * np.arange(frame_rate) / frame_rate)).astype(np.int16)
+    noise = rng.normal(0, 32767 * 10 ** (-60 / 20), frame_rate).astype(np.int16)
+    samples = np.concatenate([tone, noise, np.array([-32768, -3], dtype=np.int16)])
+
+    min_abs, histogram = _process_chunk_for_min_dbfs(samples.tobytes(), 2, frame_rate, 1)
+    expected = np.abs(samples[samples != 0].astype(np.int32)).min()
+    assert min_abs == expected
+
+    noise_floor = _histogram_percentile(histogram, NOISE_FLOOR_HISTOGRAM_EDGES, 10)
+    assert -62 <= noise_floor <= -58
+
+    # Digital silence has no non-zero samples and no noise floor
+    min_abs, histogram = _process_chunk_for_min_dbfs(bytes(2 * frame_rate), 2, frame_rate, 1)
+    assert min_abs is None
+    assert _histogram_percentile(histogram, NOISE_FLOOR_HISTOGRAM_EDGES, 10) is None
+
+def test_app_import_does_not_load_audio_stack():
+    """Test that importing the web app defers pydub and NumPy (fast cold start)."""
+    import subprocess
+
+    code = "import sys; import src.app; print(','.join(m for m in ('pydub', 'numpy') if m in sys.modules))"
+    result = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True,
+                            cwd=os.path.join(os.path.dirname(__file__), '..'), check=True)
+    assert result.stdout.strip() == ''
+
+def test_worker_pool_is_reused():
+    """Test that the analysis worker pool persists between calls and is resized on demand."""
+    from src.audio_processor import (_get_worker_pool, _submit_to_worker_pool, _warm_up_task,
+                                     shutdown_worker_pool)
+
+    try:
+        pool = _get_worker_pool(2)
+        assert _get_worker_pool(2) is pool
+        pids = set(pool.map(_warm_up_task, range(4)))
+        assert os.getpid() not in pids
+
+        resized = _get_worker_pool(1)
+        assert resized is not pool
+
+        # A request still holding the old pool moves its tasks to the resized one
+        with pytest.raises(RuntimeError):
+            pool.submit(_warm_up_task, 0)
+        futures = _submit_to_worker_pool(pool, 2, _warm_up_task, list(range(3)))
+        assert len([f.result() for f in futures]) == 3
+        assert _get_worker_pool(1) is resized
+    finally:
+        shutdown_worker_pool()
+
+def test_ffmpeg_probe_is_cached():
+    """Test that the FFmpeg lookup runs once and is cached."""
+    from src.startup import ffmpeg_path, ffmpeg_available
+
+    ffmpeg_path.cache_clear()
+    ffmpeg_available()
+    ffmpeg_available()
+    assert ffmpeg_path.cache_info().misses == 1
+
+def test_chunked_upload_manager_out_of_order_parts():
+    """Test writing parts out of order, incremental hashing and early completion."""
+    from src.chunked_upload import ChunkedUploadManager
+    import hashlib
+    import io
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        content = os.urandom(5 * 1024 + 100)
+        completed = []
+
+        def on_complete(session):
+            with open(session.temp_path, 'rb') as f:
+                completed.append((session.content_hash, f.read()))
+            return {'success': True}
+
+        manager = ChunkedUploadManager(
+            lambda ext: os.path.join(tmpdir, f'upload.{ext}'), on_complete,
+            max_size=1024 * 1024, default_part_size=1024, min_part_size=1024
+        )
+        session = manager.init('song.mp3', 'mp3', len(content))
+        assert session.total_parts == 6
+
+        # Wrong-sized parts are rejected and not marked as received
+        with pytest.raises(ValueError):
+            manager.write_part(session.upload_id, 0, io.BytesIO(content[:1025]))
+        with pytest.raises(ValueError):
+            manager.write_part(session.upload_id, 6, io.BytesIO(b''))
+
+        for index in (3, 1, 5, 0, 4):
+            manager.write_part(session.upload_id, index, io.BytesIO(content[index * 1024:(index + 1) * 1024]))
+        assert session.missing_parts() == [2]
+        assert session.hashed_parts == 2
+
+        # Hashed parts may be re-sent with the same bytes only
+        manager.write_part(session.upload_id, 0, io.BytesIO(content[:1024]))
+        with pytest.raises(ValueError):
+            manager.write_part(session.upload_id, 0, io.BytesIO(b'B' * 1024))
+        # Received but not yet hashed parts may be overwritten (retries)
+        manager.write_part(session.upload_id, 3, io.BytesIO(b'B' * 1024))
+        manager.write_part(session.upload_id, 3, io.BytesIO(content[3072:4096]))
+        with pytest.raises(ValueError):
+            manager.complete(session.upload_id)
+
+        # The final part starts finalization without waiting for complete()
+        manager.write_part(session.upload_id, 2, io.BytesIO(content[2048:3072]))
+        assert session.future is not None
+        assert manager.complete(session.upload_id) == {'success': True}
+        assert completed == [(hashlib.sha256(content).hexdigest(), content)]
+        assert manager.get(session.upload_id) is None
+
+def test_chunked_upload_manager_limits_reserved_space():
+    """Test that unfinished uploads are capped in number and reserved size, and count against the quota."""
+    from src.chunked_upload import ChunkedUploadManager
+    from src.file_registry import FileRegistry
+    import io
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        paths = iter(range(100))
+        manager = ChunkedUploadManager(
+            lambda ext: os.path.join(tmpdir, f'upload{next(paths)}.{ext}'), lambda session: {'success': True},
+            max_size=1024 * 1024, default_part_size=1024, min_part_size=1024,
+            max_sessions=2, max_reserved_bytes=3000
+        )
+        first = manager.init('a.mp3', 'mp3', 2000)
+        with pytest.raises(ValueError):
+            manager.init('b.mp3', 'mp3', 1001)
+        second = manager.init('b.mp3', 'mp3', 1000)
+        assert manager.reserved_bytes() == 3000
+        with pytest.raises(ValueError):
+            manager.init('c.mp3', 'mp3', 1)
+        assert len(os.listdir(tmpdir)) == 2
+
+        # Reserved space evicts registered files to keep the total within the quota
+        registry = FileRegistry(':memory:', ttl_seconds=None, max_bytes=4000)
+        registry.add_reservation(manager.reserved_bytes)
+        stored = os.path.join(tmpdir, 'stored.mp3')
+        with open(stored, 'wb') as f:
+            f.write(b'x' * 1500)
+        stored_id = registry.register(stored, 'stored.mp3')
+        assert registry.enforce_quota() == 1
+        assert registry.get(stored_id) is None and not os.path.exists(stored)
+
+        # A finished upload no longer holds a reservation
+        manager.write_part(second.upload_id, 0, io.BytesIO(b'x' * 1000))
+        assert manager.complete(second.upload_id) == {'success': True}
+        assert manager.reserved_bytes() == 2000
+        third = manager.init('c.mp3', 'mp3', 1000)
+        assert manager.abort(first.upload_id) and manager.abort(third.upload_id)
+        assert manager.reserved_bytes() == 0
+
+def test_chunked_upload_routes(client, monkeypatch):
+    """Test the init / PUT part / complete protocol of resumable uploads."""
+    from src import app as app_module
+    import hashlib
+
+    def on_complete(session):
+        os.remove(session.temp_path)
+        return {'success': True, 'content_hash': session.content_hash}
+
+    monkeypatch.setattr(app_module, 'ffmpeg_available', lambda: True)
+    monkeypatch.setattr(app_module.chunked_uploads, 'on_complete', on_complete)
+
+    content = os.urandom(300 * 1024)
+    response = client.post('/upload/chunked', json={'filename': 'song.txt', 'size': len(content)})
+    assert response.status_code == 400
+    response = client.post('/upload/chunked', json={'filename': 'song.mp3', 'size': len(content),
+                                                    'part_size': 256 * 1024})
+    assert response.status_code == 200
+    upload = response.get_json()
+    assert upload['total_parts'] == 2
+
+    url = f"/upload/chunked/{upload['upload_id']}"
+    assert client.put(url + '/parts/1', data=content[256 * 1024:]).status_code == 200
+    assert client.get(url).get_json()['received_parts'] == [1]
+    assert client.post(url + '/complete').status_code == 400
+    assert client.put(url + '/parts/0', data=content[:256 * 1024]).status_code == 200
+
+    response = client.post(url + '/complete')
+    assert response.status_code == 200
+    assert response.get_json()['content_hash'] == hashlib.sha256(content).hexdigest()
+    assert client.get(url).status_code == 404
+
+def test_progress_tracker_events(monkeypatch):
+    """Test progress events, ETA and the end-of-job event."""
+    from src import progress
+    from src.progress import ProgressTracker, is_valid_progress_id
+
+    assert is_valid_progress_id('0b6f2a0e-2b44-4a51-9d0d-0f5c8c6f3c11')
+    assert not is_valid_progress_id('../etc')
+    assert not is_valid_progress_id(None)
+
+    # Four chunks taking a second each; the stage reports its start first
+    now = [progress.time.time()]
+    monkeypatch.setattr(progress.time, 'time', lambda: now[0])
+    tracker = ProgressTracker()
+    tracker.update('job-00001', 'peak', 0, 4, statistics={'duration_seconds': 1.0})
+    for done in range(1, 5):
+        now[0] += 1.0
+        tracker.update('job-00001', 'peak', done, 4)
+    tracker.finish('job-00001')
+
+    events = list(tracker.events('job-00001'))
+    assert [e['event'] for e in events] == ['progress'] * 5 + ['done']
+    assert events[0]['statistics'] == {'duration_seconds': 1.0}
+    assert [e['eta_seconds'] for e in events[:5]] == [None, 3.0, 2.0, 1.0, 0.0]
+    monkeypatch.undo()
+
+    # Finishing twice keeps the first outcome
+    tracker.finish('job-00001', error='late error')
+    assert 'error' not in list(tracker.events('job-00001'))[-1]
+
+    # Subscribers to an unknown job wait for it without creating it
+    assert list(tracker.events('job-unknown', keepalive_seconds=0.01, max_wait_seconds=0.05))[:1] == [None]
+    assert 'job-unknown' not in tracker._jobs
+
+def test_get_statistics_reports_partial_statistics():
+    """Test that analysis reports per-stage progress with partial statistics."""
+    from pydub.generators import Sine
+
+    audio = Sine(440, sample_rate=8000).to_audio_segment(duration=2000, volume=-6).set_channels(1)
+    processor = _processor_for_segment(audio)
+    events = []
+    stats = processor.get_statistics(
+        progress_callback=lambda stage, done, total, **data: events.append((stage, done, total, data)))
+
+    # Every stage reports its start (done=0) before its single chunk
+    assert [e[:3] for e in events] == [('channels', 0, 1), ('channels', 1, 1), ('noise_floor', 0, 1),
+                                       ('noise_floor', 1, 1), ('silence', 0, 1), ('silence', 1, 1)]
+    # Duration is known from the start; the peak once the per-channel pass is done
+    assert events[0][3]['statistics']['duration_seconds'] == stats['duration_seconds']
+    assert 'max_dbfs' not in events[0][3]['statistics']
+    assert events[1][3]['statistics']['max_dbfs'] == stats['max_dbfs']
+    assert events[3][3]['statistics']['max_dbfs'] == stats['max_dbfs']
+    assert 'non_silence_seconds' not in events[4][3]['statistics']
+
+def test_progress_stream_route(client):
+    """Test the server-sent events stream for a finished job."""
+    from src.app import progress_tracker
+
+    progress_tracker.update('route-job-1', 'render', 1, 2)
+    progress_tracker.finish('route-job-1')
+
+    response = client.get('/progress/route-job-1')
+    assert response.status_code == 200
+    assert response.mimetype == 'text/event-stream'
+    body = response.get_data(as_text=True)
+    assert '"stage": "render"' in body
+    assert '"event": "done"' in body
+
+    assert client.get('/progress/bad').status_code == 400
+
+def test_progress_finished_on_early_errors(client):
+    """Test that requests rejected before any work still finish their progress job."""
+    from src.app import progress_tracker
+
+    response = client.post('/process', json={'file_id': 'missing', 'operation': 'gain',
+                                             'progress_id': 'early-error-job-1'})
+    assert response.status_code == 404
+    events = list(progress_tracker.events('early-error-job-1'))
+    assert events == [{'event': 'done', 'error': 'Invalid file ID'}]
+
+    response = client.post('/upload', data={'progress_id': 'early-error-job-2'})
+    assert response.status_code == 400
+    assert list(progress_tracker.events('early-error-job-2'))[-1]['error'] == 'No file part'
+
+    response = client.get('/statistics/missing?progress_id=early-error-job-3')
+    assert response.status_code == 404
+    assert list(progress_tracker.events('early-error-job-3'))[-1]['event'] == 'done'
+
+def _mp3_frames(count, first_frame=None):
+    """Build MPEG-1 Layer III frames (128 kbps, 44.1 kHz, stereo) with silent payloads."""
+    header = bytes([0xFF, 0xFB, 0x90, 0x00])
+    frame = header + bytes(417 - 4)
+    frames = [frame] * count
+    if first_frame is not None:
+        frames[0] = header + first_frame + bytes(417 - 4 - len(first_frame))
+    return b''.join(frames)
+
+def test_probe_mp3():
+    """Test MP3 duration from frame headers and from a Xing/LAME header."""
+    from src.probe import probe_audio_file
+
+    id3v2 = b'ID3\x04\x00\x00\x00\x00\x00\x0a' + bytes(10)
+    id3v1 = b'TAG' + bytes(125)
+    with tempfile.TemporaryDirectory() as temp_dir:
+        path = os.path.join(temp_dir, 'cbr.mp3')
+        with open(path, 'wb') as f:
+            f.write(id3v2 + _mp3_frames(10) + id3v1)
+        metadata = probe_audio_file(path)
+        assert metadata['format'] == 'mp3'
+        assert metadata['sample_rate'] == 44100
+        assert metadata['channels'] == 2
+        assert metadata['frames'] == 10
+        assert metadata['duration_source'] == 'frames'
+        assert metadata['duration_ms'] == round(10 * 1152 * 1000 / 44100)
+
+        # Xing header (frame count only) followed by a LAME tag with
+        # encoder delay 576 and padding 1000
+        xing = bytes(32) + b'Xing' + (1).to_bytes(4, 'big') + (1000).to_bytes(4, 'big')
+        lame = b'LAME' + bytes(17) + ((576 << 12) | 1000).to_bytes(3, 'big')
+        path = os.path.join(temp_dir, 'vbr.mp3')
+        with open(path, 'wb') as f:
+            f.write(_mp3_frames(3, first_frame=xing + lame))
+        metadata = probe_audio_file(path)
+        assert metadata['duration_source'] == 'xing'
+        assert metadata['frames'] == 1000
+        assert metadata['duration_ms'] == round((1000 * 1152 - 1576) * 1000 / 44100)
+
+        # FFmpeg writes the same tag with its own encoder string
+        lavc = b'Lavc60.31' + bytes(12) + ((1105 << 12) | 500).to_bytes(3, 'big')
+        with open(path, 'wb') as f:
+            f.write(_mp3_frames(3, first_frame=xing + lavc))
+        metadata = probe_audio_file(path)
+        assert metadata['duration_ms'] == round((1000 * 1152 - 1605) * 1000 / 44100)
+
+def test_probe_aac_and_ac3():
+    """Test AAC (ADTS) and 5.1 AC-3 durations from frame headers."""
+    from src.probe import probe_audio_file
+
+    # ADTS: AAC LC, 44.1 kHz, stereo, 200-byte frames of one raw data block
+    length = 200
+    adts = bytes([0xFF, 0xF1, 0x50, 0x80 | (length >> 11), (length >> 3) & 0xFF,
+                  ((length & 0x07) << 5) | 0x1F, 0xFC]) + bytes(length - 7)
+    # AC-3: 48 kHz, 384 kbps (1536-byte frames), bsid 8, 3/2 + LFE
+    ac3 = bytes([0x0B, 0x77, 0x00, 0x00, 0x1C, 0x40, 0xE1]) + bytes(1536 - 7)
+    with tempfile.TemporaryDirectory() as temp_dir:
+        path = os.path.join(temp_dir, 'test.aac')
+        with open(path, 'wb') as f:
+            f.write(adts * 43)
+        metadata = probe_audio_file(path)
+        assert metadata['format'] == 'aac'
+        assert metadata['codec'] == 'AAC LC (ADTS)'
+        assert (metadata['sample_rate'], metadata['channels']) == (44100, 2)
+        assert metadata['duration_ms'] == round(43 * 1024 * 1000 / 44100)
+
+        path = os.path.join(temp_dir, 'test.ac3')
+        with open(path, 'wb') as f:
+            f.write(ac3 * 10)
+        metadata = probe_audio_file(path)
+        assert metadata['format'] == 'ac3'
+        assert (metadata['sample_rate'], metadata['channels']) == (48000, 6)
+        assert metadata['channel_layout'] == '3/2+LFE'
+        assert metadata['duration_ms'] == 320
+        assert metadata['bitrate_kbps'] == 384.0
+
+        path = os.path.join(temp_dir, 'noise.mp3')
+        with open(path, 'wb') as f:
+            f.write(b'not audio' * 100)
+        with pytest.raises(ValueError):
+            probe_audio_file(path)
+
+def test_upload_probe_mode(client, monkeypatch):
+    """Test that ?mode=probe returns metadata without decoding (no FFmpeg needed)."""
+    from io import BytesIO
+    from src import app as app_module
+    from src.app import file_registry
+
+    monkeypatch.setattr(app_module, 'ffmpeg_available', lambda: False)
+
+    response = client.post('/upload?mode=bogus', data={'file': (BytesIO(_mp3_frames(10)), 'test.mp3')},
+                           content_type='multipart/form-data')
+    assert response.status_code == 400
+
+    response = client.post('/upload?mode=probe', data={'file': (BytesIO(b'not audio' * 100), 'test.mp3')},
+                           content_type='multipart/form-data')
+    assert response.status_code == 400
+
+    response = client.post('/upload?mode=probe', data={'file': (BytesIO(_mp3_frames(10)), 'test.mp3')},
+                           content_type='multipart/form-data')
+    assert response.status_code == 200
+    data = response.get_json()
+    try:
+        assert data['metadata']['duration_ms'] == round(10 * 1152 * 1000 / 44100)
+        assert 'statistics' not in data
+
+        # The full analysis is deferred to /statistics/<file_id>, which needs FFmpeg
+        assert client.get(f"/statistics/{data['file_id']}").status_code == 503
+        assert client.get('/statistics/invalid-id').status_code == 404
+    finally:
+        file_registry.remove(data['file_id'])
+
+def test_upload_pins_shared_copy_during_analysis(monkeypatch):
+    """Test that a deduplicated upload keeps its stored copy while it is analyzed."""
+    from src import audio_processor
+    from src.app import file_registry, content_store, _store_and_analyze_upload
+    from pydub.generators import Sine
+
+    stored_path = content_store.path_for('test-pin-hash', 'mp3')
+    with open(stored_path, 'wb') as f:
+        f.write(b'shared copy')
+    first_id = file_registry.register(stored_path, 'song.mp3', content_hash='test-pin-hash')
+    processor = _processor_for_segment(Sine(440, sample_rate=8000).to_audio_segment(duration=500).set_channels(1))
+
+    def remove_first_upload_then_decode(filepath):
+        # The other upload of the same content expires during the analysis
+        file_registry.remove(first_id)
+        return processor
+
+    monkeypatch.setattr(audio_processor, 'AudioProcessor', remove_first_upload_then_decode)
+    temp_path = content_store.temp_path('mp3')
+    with open(temp_path, 'wb') as f:
+        f.write(b'shared copy')
+    result = _store_and_analyze_upload(temp_path, 'song.mp3', 'mp3', 'test-pin-hash')
+    try:
+        assert os.path.exists(stored_path)
+        assert file_registry.get(result['file_id'])['filepath'] == stored_path
+    finally:
+        file_registry.remove(result['file_id'])
+    assert not os.path.exists(stored_path)
+
+def test_analysis_proxy_matches_full_rate_statistics():
+    """Test that proxy-based statistics match full-rate ones (peak exact, RMS within bounds)."""
+    import numpy as np
+    from pydub import AudioSegment
+    from pydub.generators import Sine
+    from pydub.silence import detect_nonsilent
+    from src.audio_processor import _process_proxy_chunk_for_nonsilence, ANALYSIS_PROXY_RATE
+
+    # Stereo 44.1 kHz: tone bursts with quiet noise between them, right channel
+    # in anti-phase (a waveform downmix would cancel to silence)
+    rng = np.random.default_rng(0)
+    tone = np.array(Sine(1000).to_audio_segment(duration=1000, volume=-12).set_frame_rate(44100)
+                    .set_channels(1).get_array_of_samples(), dtype=np.int16)
+    noise = rng.normal(0, 20, 44100).astype(np.int16)
+    left = np.concatenate([tone, noise, tone[:22050], noise])
+    interleaved = np.column_stack([left, -left]).ravel().astype('<i2')
+    audio = AudioSegment(data=interleaved.tobytes(), sample_width=2, frame_rate=44100, channels=2)
+
+    # The per-channel pass yields the proxy, so get_statistics() needs no extra full-rate pass
+    processor = _processor_for_segment(audio)
+    proxy = processor._analyze_channels(with_proxy=True)[2]
+    assert (proxy.frame_rate, proxy.channels, proxy.sample_width) == (ANALYSIS_PROXY_RATE, 1, 2)
+    assert len(proxy) == len(audio)
+    assert abs(proxy[0:1000].rms - audio[0:1000].rms) <= 1
+    assert abs(proxy[2000:2500].rms - audio[2000:2500].rms) <= 1
+
+    # Vectorized silence detection on the proxy matches pydub's detect_nonsilent()
+    levels = rng.choice([0, 50, 150, 2000], size=3000).astype('<i2')
+    random_proxy = AudioSegment(data=levels.tobytes(), sample_width=2, frame_rate=ANALYSIS_PROXY_RATE, channels=1)
+    expected = sum(end - start for start, end in detect_nonsilent(random_proxy, min_silence_len=100, silence_thresh=-50))
+    assert _process_proxy_chunk_for_nonsilence(levels.tobytes(), 2, ANALYSIS_PROXY_RATE, 1, -50) == expected
+
+    full = processor.get_statistics()
+    fast = processor.get_statistics(use_analysis_proxy=True)
+    assert full['max_dbfs'] == round(audio.max_dBFS, 2)
+    assert fast['max_dbfs'] == full['max_dbfs']
+    assert fast['min_dbfs'] == full['min_dbfs']
+    assert fast['channel_statistics'] == full['channel_statistics']
+    assert fast['non_silence_seconds'] == full['non_silence_seconds'] == 1.5
+    assert abs(fast['noise_floor_dbfs'] - full['noise_floor_dbfs']) <= 0.5
+
+def test_channel_statistics_loudness_reference():
+    """Test per-channel loudness against the BS.1770 reference (1 kHz sine at -20 dBFS is -23.01 LUFS)."""
+    from pydub.generators import Sine
+
+    audio = Sine(1000, sample_rate=48000).to_audio_segment(duration=5000, volume=-20)
+    (channel,) = _processor_for_segment(audio)._calculate_channel_statistics()
+    assert channel['label'] == 'M'
+    assert abs(channel['max_dbfs'] - -20.0) <= 0.01
+    assert abs(channel['rms_dbfs'] - -23.01) <= 0.02
+    assert abs(channel['loudness_lufs'] - -23.01) <= 0.05
+    assert channel['non_silence_seconds'] == 5.0
+
+def test_channel_statistics_loudness_low_frequencies(monkeypatch):
+    """Test loudness of brown noise and subsonic rumble against a sample-by-sample K-weighting filter."""
+    import numpy as np
+    from pydub import AudioSegment
+    from src.audio_processor import ThreadConfig, _k_weighting_biquads, _gated_loudness
+
+    # The designed biquads match the BS.1770 reference coefficients at 48 kHz
+    (shelf_b, shelf_a), (highpass_b, highpass_a) = _k_weighting_biquads(48000)
+    assert np.allclose(shelf_b, [1.53512485958697, -2.69169618940638, 1.19839281085285], atol=1e-8)
+    assert np.allclose(shelf_a, [1.0, -1.69065929318241, 0.73248077421585], atol=1e-8)
+    assert np.allclose(highpass_a, [1.0, -1.99004745483398, 0.99007225036621], atol=1e-8)
+
+    frame_rate = 8000
+    frames = frame_rate * 12
+    t = np.arange(frames) / frame_rate
+    rng = np.random.default_rng(0)
+    brown = np.cumsum(rng.normal(size=frames))
+    brown = 0.4 * (brown - brown.mean()) / np.abs(brown - brown.mean()).max()
+    rumble = 0.5 * np.sin(2 * np.pi * 3 * t) + 0.05 * np.sin(2 * np.pi * 440 * t)
+    interleaved = np.column_stack([brown, rumble]).ravel()
+    data = np.rint(interleaved * 32767).astype('<i2')
+    audio = AudioSegment(data=data.tobytes(), sample_width=2, frame_rate=frame_rate, channels=2)
+
+    def reference_loudness(x):
+        for b, a in _k_weighting_biquads(frame_rate):
+            y = []
+            x1 = x2 = y1 = y2 = 0.0
+            for value in x.tolist():
+                out = b[0] * value + b[1] * x1 + b[2] * x2 - a[1] * y1 - a[2] * y2
+                x2, x1, y2, y1 = x1, value, y1, out
+                y.append(out)
+            x = np.array(y)
+        subblock_len = frame_rate // 10
+        return _gated_loudness((x * x).reshape(-1, subblock_len).mean(axis=1))
+
+    samples = data.reshape(-1, 2) / 32768.0
+    expected = [reference_loudness(samples[:, channel]) for channel in range(2)]
+
+    processor = _processor_for_segment(audio)
+    sequential = processor._calculate_channel_statistics()
+    # Two chunks (10 s and 2 s): the second one is primed with the end of the first
+    monkeypatch.setattr(ThreadConfig, 'get_num_threads', classmethod(lambda cls: 2))
+    chunked = processor._calculate_channel_statistics()
+    for stats in (sequential, chunked):
+        for channel in range(2):
+            assert abs(stats[channel]['loudness_lufs'] - expected[channel]) <= 0.02
+
+def test_channel_statistics_5_1(monkeypatch):
+    """Test 5.1 per-channel statistics against split_to_mono(), with and without channel groups."""
+    import numpy as np
+    from pydub import AudioSegment
+    from pydub.generators import Sine
+    from pydub.silence import detect_nonsilent
+    from src.audio_processor import ThreadConfig
+
+    levels = [-6, -12, -18, None, -24, -30]
+    mono = []
+    for channel, level in enumerate(levels):
+        if level is None:
+            mono.append(np.zeros(48000 * 3, dtype=np.int16))
+            continue
+        tone = Sine(200 * (channel + 1), sample_rate=48000).to_audio_segment(duration=2000, volume=level)
+        samples = np.array(tone.get_array_of_samples(), dtype=np.int16)
+        # One second of silence at the start of the odd channels, at the end of the even ones
+        silence = np.zeros(48000, dtype=np.int16)
+        mono.append(np.concatenate([silence, samples] if channel % 2 else [samples, silence]))
+    interleaved = np.column_stack(mono).ravel().astype('<i2')
+    audio = AudioSegment(data=interleaved.tobytes(), sample_width=2, frame_rate=48000, channels=6)
+    processor = _processor_for_segment(audio)
+
+    sequential = processor._calculate_channel_statistics(channel_parallel=False)
+    monkeypatch.setattr(ThreadConfig, 'get_num_threads', classmethod(lambda cls: 3))
+    parallel = processor._calculate_channel_statistics(channel_parallel=True)
+    assert parallel == sequential
+
+    assert [c['label'] for c in sequential] == ['FL', 'FR', 'FC', 'LFE', 'SL', 'SR']
+    for stats, channel_audio in zip(sequential, audio.split_to_mono()):
+        if stats['label'] == 'LFE':
+            assert stats['max_dbfs'] is None and stats['rms_dbfs'] is None
+            assert stats['loudness_lufs'] is None
+            assert stats['non_silence_seconds'] == 0
+            continue
+        assert stats['max_dbfs'] == round(channel_audio.max_dBFS, 2)
+        assert abs(stats['rms_dbfs'] - channel_audio.dBFS) <= 0.01
+        expected = sum(end - start for start, end in detect_nonsilent(channel_audio, min_silence_len=100,
+                                                                      silence_thresh=-50))
+        assert stats['non_silence_seconds'] == round(expected / 1000.0, 2)
+
+def test_split_kwargs_single_task():
+    """Test that a single chunk with one split_kwargs entry still gets its overrides."""
+    from pydub.generators import Sine
+    from src.audio_processor import _parallel_process_audio_chunks
+
+    audio = Sine(440, sample_rate=8000).to_audio_segment(duration=500)
+    results = _parallel_process_audio_chunks(audio, None, lambda args: args[4], split_kwargs=[{'group': 1}],
+                                             group=0, silence_threshold=-40)
+    assert results == [[{'group': 1, 'silence_threshold': -40}]]
+
+def test_rerender_region_resumes_held_compressor_state():
+    """Test that a region after a loud-to-quiet transition re-renders without a level jump."""
+    from src.audio_processor import build_effect_chain
+    from src.dynamics import RenderState
+    from pydub.effects import compress_dynamic_range
+    from pydub.generators import Sine
+
+    loud = Sine(440, sample_rate=8000).to_audio_segment(duration=1000, volume=-3)
+    quiet = Sine(440, sample_rate=8000).to_audio_segment(duration=3000, volume=-26)
+    audio = (loud + quiet).set_channels(2)
+    processor = _processor_for_segment(audio)
+    chain = build_effect_chain([{'effect': 'compressor'}])
+
+    # Same samples as pydub's compressor, which holds the attenuation it
+    # reached in the loud part for the whole quiet part
+    base_render, base_state = processor._render_dynamics(chain, 0, len(audio))
+    assert base_render[800:1300].raw_data == compress_dynamic_range(audio[:1300])[800:].raw_data
+    assert base_render[2000:2500].dBFS < quiet.dBFS - 9
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        state_path = os.path.join(temp_dir, 'render.json')
+        base_state.save(state_path)
+        base_state = RenderState.load(state_path)
+    spliced, _ = processor.rerender_region(base_render, chain, 2.0, 2.5, base_state=base_state)
+    assert spliced.raw_data == base_render.raw_data
+
+    # Without a stored state the compressor is resumed from the start of the file
+    spliced, _ = processor.rerender_region(base_render, chain, 2.0, 2.5)
+    assert spliced.raw_data == base_render.raw_data
+
+def test_incremental_base_render_is_per_upload():
+    """Test that each upload keeps one base render of its own for incremental mode."""
+    from src.app import file_registry, _base_render_for, _register_base_render
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        upload_path = os.path.join(temp_dir, 'song.mp3')
+        render_path = os.path.join(temp_dir, 'render.wav')
+        next_render_path = os.path.join(temp_dir, 'next_render.wav')
+        for path in (upload_path, render_path, next_render_path):
+            with open(path, 'wb') as f:
+                f.write(b'data')
+        first = file_registry.register(upload_path, 'song.mp3', content_hash='same-content')
+        second = file_registry.register(upload_path, 'song.mp3', content_hash='same-content')
+        try:
+            _register_base_render(first, render_path, 'song_render.wav')
+            assert _base_render_for(first)['filepath'] == render_path
+            assert _base_render_for(first)['owner_id'] == first
+            assert _base_render_for(second) is None
+
+            # The next render replaces the entry and releases the previous file
+            _register_base_render(first, next_render_path, 'song_render.wav')
+            assert _base_render_for(first)['filepath'] == next_render_path
+            assert not os.path.exists(render_path)
+
+            # The render goes with the upload it belongs to
+            file_registry.remove(first)
+            assert file_registry.get_owned(first, 'render') is None
+            assert not os.path.exists(next_render_path)
+        finally:
+            file_registry.remove(first)
+            file_registry.remove(second)
+
+def test_incremental_region_without_base_render(client):
+    """Test that a region edit is refused once the base render is gone."""
+    from src.app import file_registry, content_store
+
+    upload_path = content_store.path_for('test-incremental-hash', 'mp3')
+    with open(upload_path, 'wb') as f:
+        f.write(b'not really audio')
+    upload_id = file_registry.register(upload_path, 'song.mp3', content_hash='test-incremental-hash')
+    try:
+        response = client.post('/process', json={'file_id': upload_id, 'mode': 'incremental',
+                                                 'chain': [{'effect': 'gain', 'gain_db': -3}],
+                                                 'start_time': 1.0, 'end_time': 1.5})
+        assert response.status_code == 409
+        response = client.post('/process', json={'file_id': f'render-{upload_id}', 'operation': 'gain'})
+        assert response.status_code == 404
+    finally:
+        file_registry.remove(upload_id)
+
 if __name__ == '__main__':
     pytest.main([__file__, '-v'])